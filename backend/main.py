@@ -41,7 +41,12 @@ entity_extraction_service = EntityExtractionService(neo4j_service, gemini_servic
 contract_extraction_service = ContractExtractionService(neo4j_service, gemini_service)
 graph_rag_service = GraphRAGService(neo4j_service, gemini_service, embedding_service)
 agentic_rag_service = AgenticRAGService(neo4j_service, gemini_service)
-knowledge_graph_construction_service = KnowledgeGraphConstructionService(neo4j_service, gemini_service)
+knowledge_graph_construction_service = KnowledgeGraphConstructionService(neo4j_service, gemini_service, embedding_service)
+
+@app.on_event("shutdown")
+def shutdown_services():
+    """Release the shared Neo4j driver and its connection pool"""
+    neo4j_service.close()
 
 # Pydantic models
 class URLRequest(BaseModel):
@@ -191,18 +196,19 @@ async def get_document_counts():
 async def text2cypher_query(request: Text2CypherRequest):
     """Convert natural language to Cypher query"""
     try:
-        cypher_query = text2cypher_service.generate_cypher(
+        cypher_query, parameters = text2cypher_service.generate_cypher(
             request.question,
             request.terminology,
             request.examples
         )
         
         # Execute the query
-        results = neo4j_service.execute_query(cypher_query)
+        results = neo4j_service.execute_query(cypher_query, parameters)
         
         return {
             "question": request.question,
             "cypher_query": cypher_query,
+            "parameters": parameters,
             "results": results
         }
     except Exception as e:
@@ -183,8 +183,8 @@ You are not allowed to make anything up or use external information.
     def text2cypher(self, question: str) -> List[Dict[str, Any]]:
         """Query the database with a user question using text2cypher."""
         try:
-            cypher_query = self.text2cypher_service.generate_cypher(question)
-            results = self.neo4j_service.execute_query(cypher_query)
+            cypher_query, parameters = self.text2cypher_service.generate_cypher(question)
+            results = self.neo4j_service.execute_query(cypher_query, parameters)
             return results
         except Exception as e:
             return [{"error": f"Error with text2cypher: {str(e)}"}]
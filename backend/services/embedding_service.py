@@ -26,9 +26,10 @@ class EmbeddingService:
             if not texts:
                 return []
             
-            # Generate embeddings
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
-            
+            # Generate embeddings; unit-norm at the source so cosine
+            # comparisons downstream reduce to a dot product
+            embeddings = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
             # Convert to list of lists for JSON serialization
             return embeddings.tolist()
             
@@ -47,7 +48,7 @@ class EmbeddingService:
             Embedding vector as list
         """
         try:
-            embedding = self.model.encode([text], convert_to_numpy=True)
+            embedding = self.model.encode([text], convert_to_numpy=True, normalize_embeddings=True)
             return embedding[0].tolist()
         except Exception as e:
             print(f"Error generating single embedding: {e}")
@@ -1,9 +1,13 @@
 import google.generativeai as genai
 import os
 import json
+import re
 from typing import List, Dict, Any, Optional
 import tiktoken
 
+# Compiled once so per-call regex cache lookups are skipped
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 class GeminiService:
     def __init__(self):
         # Configure Gemini API
@@ -17,17 +21,49 @@ class GeminiService:
         # Initialize tokenizer for token counting
         self.encoding = tiktoken.encoding_for_model("gpt-4")
     
-    def chat(self, messages: List[Dict[str, str]], model: str = "gemini-1.5-flash", 
-             temperature: float = 0, config: Dict = None) -> str:
+    def create_cached_content(self, system_instruction: str, contents: List[str],
+                              ttl: str = "3600s", model: str = "gemini-1.5-flash") -> Optional[Any]:
+        """
+        Register static prompt content with Gemini's explicit context cache
+
+        Cached tokens are billed and prefilled at a fraction of the normal
+        cost, so byte-identical system/schema text should be registered once
+        and referenced per call instead of retransmitted.
+
+        Returns:
+            CachedContent handle, or None if caching is unavailable
+        """
+        try:
+            caching = getattr(genai, "caching", None)
+            if caching is None:
+                return None
+
+            return caching.CachedContent.create(
+                model=model,
+                system_instruction=system_instruction,
+                contents=contents,
+                ttl=ttl
+            )
+
+        except Exception as e:
+            print(f"Gemini context caching unavailable: {e}")
+            return None
+
+    def chat(self, messages: List[Dict[str, str]], model: str = "gemini-1.5-flash",
+             temperature: float = 0, config: Dict = None, cached_content: Any = None) -> str:
         """
         Chat with Gemini API using messages format similar to OpenAI
         """
         try:
             # Convert OpenAI-style messages to Gemini format
             prompt = self._convert_messages_to_prompt(messages)
-            
-            # Select model
-            selected_model = self.pro_model if "pro" in model else self.text_model
+
+            # Select model; a cached-content handle pins its own model and
+            # carries the static prompt prefix server-side
+            if cached_content is not None:
+                selected_model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            else:
+                selected_model = self.pro_model if "pro" in model else self.text_model
             
             # Configure generation
             generation_config = genai.types.GenerationConfig(
@@ -51,7 +87,107 @@ class GeminiService:
             print(f"Error in Gemini chat: {e}")
             return f"Error: {str(e)}"
     
-    def chat_with_tools(self, messages: List[Dict[str, str]], tools: List[Dict] = None, 
+    def chat_structured(self, messages: List[Dict[str, str]], schema: Any,
+                        model: str = "gemini-1.5-flash", temperature: float = 0,
+                        cached_content: Any = None) -> str:
+        """
+        Chat with Gemini constrained to emit JSON matching a Pydantic schema
+
+        The schema travels in generation_config rather than as prompt text,
+        so no schema tokens are spent per call and the response is valid JSON
+        conforming to the schema.
+        """
+        try:
+            prompt = self._convert_messages_to_prompt(messages)
+
+            if cached_content is not None:
+                selected_model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            else:
+                selected_model = self.pro_model if "pro" in model else self.text_model
+
+            response = selected_model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=temperature,
+                    max_output_tokens=4096,
+                    response_mime_type="application/json",
+                    response_schema=schema,
+                )
+            )
+
+            return response.text
+
+        except Exception as e:
+            print(f"Error in Gemini structured chat: {e}")
+            return f"Error: {str(e)}"
+
+    async def achat(self, messages: List[Dict[str, str]], model: str = "gemini-1.5-flash",
+                    temperature: float = 0, config: Dict = None, cached_content: Any = None) -> str:
+        """
+        Async chat with Gemini API; concurrent calls overlap their round-trips
+        """
+        try:
+            prompt = self._convert_messages_to_prompt(messages)
+
+            if cached_content is not None:
+                selected_model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            else:
+                selected_model = self.pro_model if "pro" in model else self.text_model
+
+            generation_config = genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=4096,
+            )
+
+            if config:
+                if config.get("response_format", {}).get("type") == "json_object":
+                    prompt += "\n\nPlease respond with valid JSON only."
+
+            response = await selected_model.generate_content_async(
+                prompt,
+                generation_config=generation_config
+            )
+
+            return response.text
+
+        except Exception as e:
+            print(f"Error in Gemini async chat: {e}")
+            return f"Error: {str(e)}"
+
+    def chat_stream(self, messages: List[Dict[str, str]], model: str = "gemini-1.5-flash",
+                    temperature: float = 0, cached_content: Any = None):
+        """
+        Stream chat response text as it is generated
+
+        Yields chunks as the API produces them, so callers can surface the
+        first tokens without waiting for the full generation.
+        """
+        try:
+            prompt = self._convert_messages_to_prompt(messages)
+
+            if cached_content is not None:
+                selected_model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            else:
+                selected_model = self.pro_model if "pro" in model else self.text_model
+
+            response = selected_model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=temperature,
+                    max_output_tokens=4096,
+                ),
+                stream=True
+            )
+
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+
+        except Exception as e:
+            print(f"Error in Gemini stream chat: {e}")
+            yield f"Error: {str(e)}"
+
+    def chat_with_tools(self, messages: List[Dict[str, str]], tools: List[Dict] = None,
                        model: str = "gemini-1.5-flash") -> Any:
         """
         Chat with tools (function calling simulation)
@@ -187,8 +323,7 @@ class GeminiService:
                 return json.loads(response.text)
             except json.JSONDecodeError:
                 # Try to extract JSON from response
-                import re
-                json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+                json_match = _JSON_RE.search(response.text)
                 if json_match:
                     return json.loads(json_match.group())
                 else:
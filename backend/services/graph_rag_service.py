@@ -1,9 +1,24 @@
-from typing import List, Dict, Any, Optional
-import json
+from typing import Iterator, List, Dict, Any, Optional
+from collections import OrderedDict
+import hashlib
+import orjson
+import re
 from .neo4j_service import Neo4jService
 from .gemini_service import GeminiService
 from .embedding_service import EmbeddingService
 
+# Compiled once so per-call regex cache lookups are skipped
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def _format_context_section(items: List[Any], cap: int = 800) -> str:
+    """Serialize a context section as a compact bullet list with per-item caps
+
+    Interpolating the raw Python list would embed repr quoting and unbounded
+    chunk text into the prompt; capping each item keeps prefill tokens bounded.
+    """
+    return "\n".join(f"- {str(item)[:cap]}" for item in items)
+
 class GraphRAGService:
     def __init__(self, neo4j_service: Neo4jService, gemini_service: GeminiService, 
                  embedding_service: EmbeddingService):
@@ -18,7 +33,36 @@ class GraphRAGService:
         self.neo4j_service = neo4j_service
         self.gemini_service = gemini_service
         self.embedding_service = embedding_service
-    
+
+        # LRU cache of query embeddings; recurring queries skip the
+        # embedding round-trip entirely
+        self._query_embedding_cache = OrderedDict()
+        self._query_embedding_cache_size = 1024
+
+    def _embed_query_cached(self, query: str) -> List[float]:
+        """
+        Embed a query, reusing cached vectors for repeated query text
+
+        Args:
+            query: Query text to embed
+
+        Returns:
+            Embedding vector
+        """
+        key = hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+        cached = self._query_embedding_cache.get(key)
+        if cached is not None:
+            self._query_embedding_cache.move_to_end(key)
+            return cached
+
+        embedding = self.embedding_service.embed_single_text(query)
+        self._query_embedding_cache[key] = embedding
+        if len(self._query_embedding_cache) > self._query_embedding_cache_size:
+            self._query_embedding_cache.popitem(last=False)
+
+        return embedding
+
     def calculate_communities(self) -> Dict[str, Any]:
         """
         Calculate graph communities using Louvain algorithm
@@ -27,12 +71,14 @@ class GraphRAGService:
             Community calculation results
         """
         try:
-            # Drop existing graph projection if it exists
-            try:
+            # Drop existing graph projection if it exists; checking first
+            # avoids paying for a failing transaction on the common case
+            exists_result = self.neo4j_service.execute_query(
+                "CALL gds.graph.exists('entity') YIELD exists RETURN exists"
+            )
+            if exists_result and exists_result[0].get("exists"):
                 self.neo4j_service.execute_query("CALL gds.graph.drop('entity')")
-            except:
-                pass  # Graph might not exist
-            
+
             # Create graph projection
             projection_query = """
             MATCH (source:__Entity__)-[r:RELATIONSHIP]->(target:__Entity__)
@@ -64,42 +110,48 @@ class GraphRAGService:
         except Exception as e:
             return {"error": f"Error calculating communities: {str(e)}"}
     
-    def get_community_info(self) -> List[Dict[str, Any]]:
+    def get_community_info(self) -> Iterator[Dict[str, Any]]:
         """
-        Get information about detected communities
-        
-        Returns:
-            List of community information
+        Stream information about detected communities
+
+        Communities are yielded one at a time from an open session instead of
+        being buffered into a list, so memory stays constant regardless of
+        graph size and downstream LLM calls can overlap with fetching.
+
+        Yields:
+            Community information dictionaries
         """
+        community_query = """
+        MATCH (e:__Entity__)
+        WHERE e.louvain IS NOT NULL
+        WITH e.louvain AS louvain, collect(e) AS nodes
+        WHERE size(nodes) > 1
+        CALL apoc.path.subgraphAll(nodes[0], {
+            whitelistNodes: nodes
+        })
+        YIELD relationships
+        RETURN louvain AS communityId,
+               [n in nodes | {
+                   id: n.name,
+                   description: coalesce(n.summary, n.description[0], ''),
+                   type: coalesce(n.type, 'UNKNOWN')
+               }] AS nodes,
+               [r in relationships | {
+                   start: startNode(r).name,
+                   type: type(r),
+                   end: endNode(r).name,
+                   description: coalesce(r.summary, r.description, '')
+               }] AS rels
+        """
+
         try:
-            community_query = """
-            MATCH (e:__Entity__)
-            WHERE e.louvain IS NOT NULL
-            WITH e.louvain AS louvain, collect(e) AS nodes
-            WHERE size(nodes) > 1
-            CALL apoc.path.subgraphAll(nodes[0], {
-                whitelistNodes: nodes
-            })
-            YIELD relationships
-            RETURN louvain AS communityId,
-                   [n in nodes | {
-                       id: n.name, 
-                       description: coalesce(n.summary, n.description[0], ''), 
-                       type: coalesce(n.type, 'UNKNOWN')
-                   }] AS nodes,
-                   [r in relationships | {
-                       start: startNode(r).name, 
-                       type: type(r), 
-                       end: endNode(r).name, 
-                       description: coalesce(r.summary, r.description, '')
-                   }] AS rels
-            """
-            
-            return self.neo4j_service.execute_query(community_query)
-            
+            with self.neo4j_service.driver.session(database=self.neo4j_service.database) as session:
+                result = session.run(community_query)
+                for record in result:
+                    yield record.data()
+
         except Exception as e:
             print(f"Error getting community info: {e}")
-            return []
     
     def summarize_communities(self) -> Dict[str, Any]:
         """
@@ -109,10 +161,8 @@ class GraphRAGService:
             Community summarization results
         """
         try:
-            community_info = self.get_community_info()
-            
             communities = []
-            for community in community_info:
+            for community in self.get_community_info():
                 # Generate community summary
                 summary = self._generate_community_summary(
                     community["nodes"], 
@@ -205,13 +255,12 @@ Community Data:
             
             # Parse JSON response
             try:
-                return json.loads(response)
-            except json.JSONDecodeError:
+                return orjson.loads(response)
+            except orjson.JSONDecodeError:
                 # Try to extract JSON from response
-                import re
-                json_match = re.search(r'\{.*\}', response, re.DOTALL)
+                json_match = _JSON_RE.search(response)
                 if json_match:
-                    return json.loads(json_match.group())
+                    return orjson.loads(json_match.group())
                 else:
                     return {"error": "Could not parse community summary"}
                     
@@ -343,8 +392,8 @@ Comprehensive Response:
             Generated answer
         """
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_service.embed_single_text(query)
+            # Generate query embedding (cached for repeated queries)
+            query_embedding = self._embed_query_cached(query)
             
             # Local search query
             local_search_query = """
@@ -410,10 +459,17 @@ relevant information from the context data and incorporating any relevant genera
 If you don't know the answer, just say so. Do not make anything up.
 
 Context Data:
-Chunks: {context_data.get('Chunks', [])}
-Community Reports: {context_data.get('Reports', [])}
-Relationships: {context_data.get('Relationships', [])}
-Entities: {context_data.get('Entities', [])}
+Chunks:
+{_format_context_section(context_data.get('Chunks', []))}
+
+Community Reports:
+{_format_context_section(context_data.get('Reports', []))}
+
+Relationships:
+{_format_context_section(context_data.get('Relationships', []), cap=400)}
+
+Entities:
+{_format_context_section(context_data.get('Entities', []), cap=400)}
 
 User Question: {query}
 
@@ -484,21 +540,16 @@ Response:
         try:
             stats = {}
             
-            # Basic counts
+            # Basic counts in one plan and one round-trip
             basic_query = """
-            MATCH (e:__Entity__)
-            RETURN 'entities' AS type, count(e) AS count
-            UNION
-            MATCH ()-[:RELATIONSHIP]->()
-            RETURN 'relationships' AS type, count(*) AS count
-            UNION
-            MATCH (c:__Community__)
-            RETURN 'communities' AS type, count(c) AS count
+            RETURN COUNT { (e:__Entity__) } AS entities,
+                   COUNT { ()-[:RELATIONSHIP]->() } AS relationships,
+                   COUNT { (c:__Community__) } AS communities
             """
-            
+
             basic_results = self.neo4j_service.execute_query(basic_query)
-            for result in basic_results:
-                stats[result["type"]] = result["count"]
+            if basic_results:
+                stats.update(basic_results[0])
             
             # Community distribution
             community_dist_query = """
@@ -513,10 +564,10 @@ Response:
             # Top entities by connections
             top_entities_query = """
             MATCH (e:__Entity__)
-            RETURN e.name AS name, e.type AS type, 
-                   size((e)-[:RELATIONSHIP]-()) AS connections
+            WITH e, COUNT { (e)-[:RELATIONSHIP]-() } AS connections
             ORDER BY connections DESC
             LIMIT 10
+            RETURN e.name AS name, e.type AS type, connections
             """
             
             top_entities = self.neo4j_service.execute_query(top_entities_query)
@@ -1,18 +1,101 @@
-from typing import Dict, List, Any, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, Final, List, Any, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
 from .neo4j_service import Neo4jService
 from .gemini_service import GeminiService
-import json
+from .embedding_service import EmbeddingService
+from collections import OrderedDict
+import asyncio
+import numpy as np
+import orjson
+import threading
+import time
 import uuid
 
+# Code-fence tokens an LLM may wrap its output in, longest first
+_FENCES = ("```json", "```cypher", "```")
+
+def _strip_fence(s: str) -> str:
+    """Strip a leading/trailing Markdown code fence in a single pass"""
+    s = s.strip()
+    for fence in _FENCES:
+        if s.startswith(fence):
+            s = s[len(fence):]
+            break
+    if s.endswith("```"):
+        s = s[:-3]
+    return s.strip()
+
+def _full_address(location: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Join the non-empty components of a location into one address string
+
+    Computed in Python because Cypher string concatenation turns the whole
+    expression NULL when any component is missing, which made MERGE create
+    duplicate Location nodes.
+    """
+    if not location:
+        return None
+    parts = [location.get("address"), location.get("city"),
+             location.get("state"), location.get("country")]
+    return " ".join(filter(None, parts))
+
+# Contract types recognized by the extraction pipeline; the Literal keeps
+# the check inside the compiled validator core rather than Python
+ContractType = Literal[
+    "Service Agreement",
+    "Licensing Agreement",
+    "Non-Disclosure Agreement (NDA)",
+    "Partnership Agreement",
+    "Lease Agreement"
+]
+CONTRACT_TYPES: Final = frozenset(ContractType.__args__)
+
+# System message for contract extraction; shared across instances rather
+# than re-allocated per service
+SYSTEM_MESSAGE: Final[str] = """
+You are an expert in extracting structured information from legal documents and contracts.
+Identify key details such as parties involved, dates, terms, obligations, and legal definitions.
+Present the extracted information in a clear, structured format. Be concise, focusing on essential
+legal content and ignoring unnecessary boilerplate language. The extracted data will be used to address
+any questions that may arise regarding the contracts.
+"""
+
+# Sample contract text for demonstration
+SAMPLE_CONTRACT: Final[str] = """
+LICENSE AGREEMENT
+
+This License Agreement ("Agreement") is entered into on February 26, 1999, between Mortgage Logic.com, Inc., a California corporation with its principal place of business at Two Venture Plaza, 2 Venture, Irvine, California ("Client"), and TrueLink, Inc., a California corporation with its principal place of business at 3026 South Higuera, San Luis Obispo, California ("Provider").
+
+1. LICENSE GRANT
+TrueLink hereby grants to Mortgage Logic.com a nonexclusive license to use the Interface for origination, underwriting, processing, and funding of consumer finance receivables.
+
+2. TERM
+This Agreement shall commence on February 26, 1999, and shall continue for a period of one (1) year, with automatic renewal for successive one-year periods unless terminated with thirty (30) days' notice prior to the end of the term.
+
+3. SERVICES
+TrueLink will provide hosting services, including storage, response time management, bandwidth, availability, access to usage statistics, backups, internet connection, and domain name assistance. TrueLink will also provide support services and transmit credit data as permitted under applicable agreements and laws.
+
+4. GOVERNING LAW
+This Agreement shall be governed by and construed in accordance with the laws of the State of California.
+
+IN WITNESS WHEREOF, the parties have executed this Agreement as of the date first written above.
+"""
+
 class Location(BaseModel):
     """Represents a physical location including address, city, state, and country."""
+    # Validators are compiled eagerly at import so the first extraction call
+    # doesn't pay the schema-build cost; frozen instances are hashable for
+    # caching, extra keys from LLM over-generation are dropped instead of
+    # allocated, and string fields are stripped during validation
+    model_config = ConfigDict(
+        defer_build=False, frozen=True, extra="ignore", str_strip_whitespace=True
+    )
+
     address: Optional[str] = Field(
-        ..., description="The street address of the location."
+        None, description="The street address of the location."
     )
-    city: Optional[str] = Field(..., description="The city of the location.")
+    city: Optional[str] = Field(None, description="The city of the location.")
     state: Optional[str] = Field(
-        ..., description="The state or region of the location."
+        None, description="The state or region of the location."
     )
     country: str = Field(
         ...,
@@ -21,6 +104,10 @@ class Location(BaseModel):
 
 class Organization(BaseModel):
     """Represents an organization, including its name and location."""
+    model_config = ConfigDict(
+        defer_build=False, frozen=True, extra="ignore", str_strip_whitespace=True
+    )
+
     name: str = Field(..., description="The name of the organization.")
     location: Location = Field(
         ..., description="The primary location of the organization."
@@ -32,8 +119,12 @@ class Organization(BaseModel):
 
 class Contract(BaseModel):
     """Represents the key details of the contract."""
-    contract_type: str = Field(
-        ...,
+    model_config = ConfigDict(
+        defer_build=False, frozen=True, extra="ignore", str_strip_whitespace=True
+    )
+
+    contract_type: ContractType = Field(
+        "Service Agreement",
         description="The type of contract being entered into.",
     )
     parties: List[Organization] = Field(
@@ -53,227 +144,321 @@ class Contract(BaseModel):
         description="Description of the scope of the contract, including rights, duties, and any limitations.",
     )
     end_date: Optional[str] = Field(
-        ...,
+        None,
         description="The date when the contract becomes expires. Use yyyy-MM-dd format.",
     )
     total_amount: Optional[float] = Field(
-        ..., description="Total value of the contract."
+        None, description="Total value of the contract."
     )
     governing_law: Optional[Location] = Field(
-        ..., description="The jurisdiction's laws governing the contract."
+        None, description="The jurisdiction's laws governing the contract."
     )
 
-class KnowledgeGraphConstructionService:
-    def __init__(self, neo4j_service: Neo4jService, gemini_service: GeminiService):
-        """
-        Initialize Knowledge Graph Construction service
-        
-        Args:
-            neo4j_service: Service for Neo4j operations
-            gemini_service: Service for LLM operations
-        """
-        self.neo4j_service = neo4j_service
-        self.gemini_service = gemini_service
-        
-        # Contract types enum
-        self.contract_types = [
-            "Service Agreement",
-            "Licensing Agreement", 
-            "Non-Disclosure Agreement (NDA)",
-            "Partnership Agreement",
-            "Lease Agreement"
-        ]
-        
-        # System message for contract extraction
-        self.system_message = """
-You are an expert in extracting structured information from legal documents and contracts.
-Identify key details such as parties involved, dates, terms, obligations, and legal definitions.
-Present the extracted information in a clear, structured format. Be concise, focusing on essential
-legal content and ignoring unnecessary boilerplate language. The extracted data will be used to address
-any questions that may arise regarding the contracts.
-"""
-        
-        # Sample contract text for demonstration
-        self.sample_contract = """
-LICENSE AGREEMENT
-
-This License Agreement ("Agreement") is entered into on February 26, 1999, between Mortgage Logic.com, Inc., a California corporation with its principal place of business at Two Venture Plaza, 2 Venture, Irvine, California ("Client"), and TrueLink, Inc., a California corporation with its principal place of business at 3026 South Higuera, San Luis Obispo, California ("Provider").
-
-1. LICENSE GRANT
-TrueLink hereby grants to Mortgage Logic.com a nonexclusive license to use the Interface for origination, underwriting, processing, and funding of consumer finance receivables.
-
-2. TERM
-This Agreement shall commence on February 26, 1999, and shall continue for a period of one (1) year, with automatic renewal for successive one-year periods unless terminated with thirty (30) days' notice prior to the end of the term.
-
-3. SERVICES
-TrueLink will provide hosting services, including storage, response time management, bandwidth, availability, access to usage statistics, backups, internet connection, and domain name assistance. TrueLink will also provide support services and transmit credit data as permitted under applicable agreements and laws.
+    @field_validator("contract_type", mode="before")
+    @classmethod
+    def _coerce_contract_type(cls, value: Any) -> str:
+        """Coerce unrecognized contract types to the default"""
+        return value if value in CONTRACT_TYPES else "Service Agreement"
 
-4. GOVERNING LAW
-This Agreement shall be governed by and construed in accordance with the laws of the State of California.
+# Validators built once at import and reused across calls; never construct
+# a TypeAdapter inside a method body
+_CONTRACT_ADAPTER = TypeAdapter(Contract)
 
-IN WITNESS WHEREOF, the parties have executed this Agreement as of the date first written above.
-"""
-
-    def extract_contract_info(self, document: str) -> Dict[str, Any]:
-        """
-        Extract structured contract information from text using LLM
-        
-        Args:
-            document: Contract text to extract information from
-            
-        Returns:
-            Dictionary containing extracted contract information
-        """
-        try:
-            # Create the prompt for contract extraction
-            messages = [
-                {"role": "system", "content": self.system_message},
-                {"role": "user", "content": document}
-            ]
-            
-            # Use Gemini to extract structured information
-            response = self.gemini_service.chat(messages)
-            
-            # Try to parse the response as JSON
-            try:
-                # Clean the response to extract JSON
-                response_text = response.strip()
-                if response_text.startswith("```json"):
-                    response_text = response_text.replace("```json", "").replace("```", "").strip()
-                elif response_text.startswith("```"):
-                    response_text = response_text.replace("```", "").strip()
-                
-                # Parse as JSON
-                contract_data = json.loads(response_text)
-                
-                # Validate and structure the data
-                structured_data = self._structure_contract_data(contract_data)
-                return structured_data
-                
-            except json.JSONDecodeError:
-                # If JSON parsing fails, try to extract information using a more structured approach
-                return self._extract_with_structured_prompt(document)
-                
-        except Exception as e:
-            return {"error": f"Error extracting contract information: {str(e)}"}
-
-    def _extract_with_structured_prompt(self, document: str) -> Dict[str, Any]:
-        """
-        Extract contract information using a more structured prompt approach
-        
-        Args:
-            document: Contract text
-            
-        Returns:
-            Structured contract data
-        """
-        try:
-            # Create a more specific prompt for extraction
-            extraction_prompt = f"""
+# Static extraction format instructions, shared between the structured
+# prompt fallback and the Gemini context cache registration
+EXTRACTION_SCHEMA_TEMPLATE = """
 Extract the following information from this contract document and return it as a JSON object:
 
-{{
+{
     "contract_type": "Type of contract (Service Agreement, Licensing Agreement, NDA, Partnership Agreement, or Lease Agreement)",
     "parties": [
-        {{
+        {
             "name": "Organization name",
-            "location": {{
+            "location": {
                 "address": "Street address",
                 "city": "City",
                 "state": "State",
                 "country": "Two-letter country code (e.g., US)"
-            }},
+            },
             "role": "Role in contract (client, provider, supplier, etc.)"
-        }}
+        }
     ],
     "effective_date": "Start date in yyyy-MM-dd format",
     "term": "Duration and renewal terms",
     "contract_scope": "Description of what the contract covers",
     "end_date": "End date in yyyy-MM-dd format (if specified)",
     "total_amount": "Total contract value (if specified)",
-    "governing_law": {{
+    "governing_law": {
         "address": "Address of governing jurisdiction",
-        "city": "City of governing jurisdiction", 
+        "city": "City of governing jurisdiction",
         "state": "State of governing jurisdiction",
         "country": "Country of governing jurisdiction"
-    }}
-}}
+    }
+}
+"""
 
-Contract document:
-{document}
 
-Return only the JSON object, no additional text.
+class _Q:
+    """Static Cypher texts, parameterized and defined once at module load
+
+    Reusing the identical query string on every call keeps the driver's
+    query-plan cache warm; all dynamic values travel as $parameters.
+    """
+
+    IMPORT = """
+WITH $data AS contract_data
+MERGE (contract:Contract {id: randomUUID()})
+SET contract += {
+    contract_type: contract_data.contract_type,
+    effective_date: contract_data.effective_date,
+    term: contract_data.term,
+    contract_scope: contract_data.contract_scope,
+    end_date: contract_data.end_date,
+    total_amount: contract_data.total_amount,
+    governing_law: contract_data.governing_law.fullAddress
+}
+WITH contract, contract_data
+UNWIND contract_data.parties AS party
+MERGE (p:Organization {name: party.name})
+MERGE (loc:Location {fullAddress: party.location.fullAddress})
+ON CREATE SET loc.address = party.location.address,
+              loc.city    = party.location.city,
+              loc.state   = party.location.state,
+              loc.country = party.location.country
+MERGE (p)-[:LOCATED_AT]->(loc)
+MERGE (p)-[r:HAS_PARTY]->(contract)
+SET r.role = party.role
 """
-            
-            messages = [{"role": "user", "content": extraction_prompt}]
-            response = self.gemini_service.chat(messages)
-            
-            # Clean and parse the response
-            response_text = response.strip()
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
-            elif response_text.startswith("```"):
-                response_text = response_text.replace("```", "").strip()
-            
-            contract_data = json.loads(response_text)
-            return self._structure_contract_data(contract_data)
-            
-        except Exception as e:
-            return {"error": f"Error in structured extraction: {str(e)}"}
 
-    def _structure_contract_data(self, contract_data: Dict[str, Any]) -> Dict[str, Any]:
+    IMPORT_BATCH = """
+UNWIND $contracts AS contract_data
+MERGE (contract:Contract {id: contract_data.id})
+ON CREATE SET contract += {
+    contract_type: contract_data.contract_type,
+    effective_date: contract_data.effective_date,
+    term: contract_data.term,
+    contract_scope: contract_data.contract_scope,
+    end_date: contract_data.end_date,
+    total_amount: contract_data.total_amount,
+    governing_law: contract_data.governing_law.fullAddress
+}
+WITH contract, contract_data
+UNWIND contract_data.parties AS party
+MERGE (p:Organization {name: party.name})
+MERGE (loc:Location {fullAddress: party.location.fullAddress})
+ON CREATE SET loc.address = party.location.address,
+              loc.city    = party.location.city,
+              loc.state   = party.location.state,
+              loc.country = party.location.country
+MERGE (p)-[:LOCATED_AT]->(loc)
+MERGE (p)-[r:HAS_PARTY]->(contract)
+SET r.role = party.role
+"""
+
+    GRAPH_DATA = """
+CALL {
+    MATCH (c:Contract)
+    WITH c SKIP $offset LIMIT $limit
+    RETURN collect({id: c.id, type: c.contract_type, effective_date: c.effective_date,
+                    term: c.term, scope: c.contract_scope, end_date: c.end_date,
+                    total_amount: c.total_amount, governing_law: c.governing_law}) AS contracts
+}
+CALL {
+    MATCH (o:Organization)
+    WITH o SKIP $offset LIMIT $limit
+    RETURN collect({name: o.name, role: o.role}) AS organizations
+}
+CALL {
+    MATCH (l:Location)
+    WITH l SKIP $offset LIMIT $limit
+    RETURN collect({fullAddress: l.fullAddress, address: l.address, city: l.city,
+                    state: l.state, country: l.country}) AS locations
+}
+CALL {
+    MATCH (o:Organization)-[r:HAS_PARTY]->(c:Contract)
+    WITH o, r, c SKIP $offset LIMIT $limit
+    RETURN collect({organization: o.name, contract: c.id, role: r.role}) AS party_relationships
+}
+CALL {
+    MATCH (o:Organization)-[:LOCATED_AT]->(l:Location)
+    WITH o, l SKIP $offset LIMIT $limit
+    RETURN collect({organization: o.name, location: l.fullAddress}) AS location_relationships
+}
+RETURN contracts, organizations, locations, party_relationships, location_relationships,
+       COUNT { (c:Contract) } AS total_contracts,
+       COUNT { (o:Organization) } AS total_organizations,
+       COUNT { (l:Location) } AS total_locations
+"""
+
+    CLEAR = """
+MATCH (n) WHERE n:Contract OR n:Organization OR n:Location
+CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+"""
+
+    STATS = """
+MATCH (c:Contract)
+WITH count(c) as contract_count
+
+MATCH (o:Organization)
+WITH contract_count, count(o) as org_count
+
+MATCH (l:Location)
+WITH contract_count, org_count, count(l) as location_count
+
+MATCH (o:Organization)-[:HAS_PARTY]->(c:Contract)
+WITH contract_count, org_count, location_count, count(*) as party_relationships
+
+MATCH (o:Organization)-[:LOCATED_AT]->(l:Location)
+WITH contract_count, org_count, location_count, party_relationships, count(*) as location_relationships
+
+RETURN contract_count, org_count, location_count, party_relationships, location_relationships
+"""
+
+
+class SemanticCache:
+    """
+    Semantic-similarity cache for LLM responses
+
+    Stores (embedding, value) pairs and returns the cached value when a new
+    key embeds close enough to a stored one, skipping the LLM round-trip for
+    repeated or near-identical documents.
+    """
+
+    def __init__(self, embedding_service: EmbeddingService, maxsize: int = 512,
+                 threshold: float = 0.95):
+        self.embedding_service = embedding_service
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._entries = []  # list of (unit-norm embedding, cached value)
+        self._lock = threading.Lock()
+
+    def embed_key(self, key_text: str) -> Optional[np.ndarray]:
+        """Embed a cache key as a unit-norm vector (None if embedding fails)"""
+        embedding = self.embedding_service.embed_single_text(key_text)
+        if not embedding:
+            return None
+        vec = np.array(embedding)
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            return None
+        return vec / norm
+
+    def lookup(self, key_embedding: np.ndarray) -> Optional[Any]:
+        """Return the cached value most similar to the key, if above threshold"""
+        with self._lock:
+            best_value = None
+            best_similarity = self.threshold
+            for entry_embedding, value in self._entries:
+                similarity = float(np.dot(key_embedding, entry_embedding))
+                if similarity >= best_similarity:
+                    best_similarity = similarity
+                    best_value = value
+            return best_value
+
+    def store(self, key_embedding: np.ndarray, value: Any):
+        """Store a value under its key embedding, evicting oldest when full"""
+        with self._lock:
+            self._entries.append((key_embedding, value))
+            if len(self._entries) > self.maxsize:
+                self._entries.pop(0)
+
+
+class KnowledgeGraphConstructionService:
+    def __init__(self, neo4j_service: Neo4jService, gemini_service: GeminiService,
+                 embedding_service: EmbeddingService = None):
+        """
+        Initialize Knowledge Graph Construction service
+
+        Args:
+            neo4j_service: Service for Neo4j operations
+            gemini_service: Service for LLM operations
+            embedding_service: Service for embeddings (enables semantic caching)
+        """
+        self.neo4j_service = neo4j_service
+        self.gemini_service = gemini_service
+
+        # Semantic cache over extraction results: near-identical documents
+        # reuse the previous LLM response instead of a fresh round-trip
+        self._extraction_cache = (
+            SemanticCache(embedding_service) if embedding_service else None
+        )
+
+        # Exact-match cache for repeated natural-language queries; the TTL
+        # bounds how long answers can outlive graph updates, and write paths
+        # clear it outright
+        self._query_cache = OrderedDict()
+        self._query_cache_size = 1024
+        self._query_cache_ttl = 300
+
+        # Contract types enum; references the shared module-level frozenset
+        self.contract_types = CONTRACT_TYPES
+
+        # Shared prompt/sample constants; bound here for callers that reach
+        # through the instance
+        self.system_message = SYSTEM_MESSAGE
+        self.sample_contract = SAMPLE_CONTRACT
+
+        # Register the static extraction prompt with Gemini's context cache so
+        # it is prefilled server-side instead of retransmitted per call; Gemini
+        # requires at least 2048 cached tokens, so small prompts stay inline
+        self._extraction_cached_content = None
+        static_prompt = self.system_message + EXTRACTION_SCHEMA_TEMPLATE
+        if self.gemini_service.num_tokens_from_string(static_prompt) >= 2048:
+            self._extraction_cached_content = self.gemini_service.create_cached_content(
+                system_instruction=self.system_message,
+                contents=[EXTRACTION_SCHEMA_TEMPLATE]
+            )
+
+    def extract_contract_info(self, document: str) -> Dict[str, Any]:
         """
-        Structure and validate contract data
+        Extract structured contract information from text using LLM
         
         Args:
-            contract_data: Raw contract data from LLM
+            document: Contract text to extract information from
             
         Returns:
-            Structured and validated contract data
+            Dictionary containing extracted contract information
         """
         try:
-            # Ensure required fields exist
-            structured_data = {
-                "contract_type": contract_data.get("contract_type", "Service Agreement"),
-                "parties": contract_data.get("parties", []),
-                "effective_date": contract_data.get("effective_date", ""),
-                "term": contract_data.get("term", ""),
-                "contract_scope": contract_data.get("contract_scope", ""),
-                "end_date": contract_data.get("end_date"),
-                "total_amount": contract_data.get("total_amount"),
-                "governing_law": contract_data.get("governing_law")
-            }
-            
-            # Validate contract type
-            if structured_data["contract_type"] not in self.contract_types:
-                structured_data["contract_type"] = "Service Agreement"
-            
-            # Ensure parties is a list
-            if not isinstance(structured_data["parties"], list):
-                structured_data["parties"] = []
-            
-            # Validate and structure each party
-            validated_parties = []
-            for party in structured_data["parties"]:
-                if isinstance(party, dict):
-                    validated_party = {
-                        "name": party.get("name", ""),
-                        "location": {
-                            "address": party.get("location", {}).get("address"),
-                            "city": party.get("location", {}).get("city"),
-                            "state": party.get("location", {}).get("state"),
-                            "country": party.get("location", {}).get("country", "US")
-                        },
-                        "role": party.get("role", "party")
-                    }
-                    validated_parties.append(validated_party)
-            
-            structured_data["parties"] = validated_parties
-            
+            # Check the semantic cache before paying for an LLM round-trip
+            key_embedding = None
+            if self._extraction_cache is not None:
+                key_embedding = self._extraction_cache.embed_key(document[:2000])
+                if key_embedding is not None:
+                    cached = self._extraction_cache.lookup(key_embedding)
+                    if cached is not None:
+                        return dict(cached)
+
+            # Use Gemini constrained to the Contract schema: the schema rides
+            # in generation_config instead of the prompt, and the response is
+            # guaranteed-parseable JSON, so no fallback extraction is needed.
+            # With a context cache registered, only the document is transmitted
+            if self._extraction_cached_content is not None:
+                messages = [{"role": "user", "content": document}]
+                response = self.gemini_service.chat_structured(
+                    messages, Contract, cached_content=self._extraction_cached_content
+                )
+            else:
+                messages = [
+                    {"role": "system", "content": self.system_message},
+                    {"role": "user", "content": document}
+                ]
+                response = self.gemini_service.chat_structured(messages, Contract)
+
+            # Parse and validate in a single pass over the JSON
+            response_text = _strip_fence(response)
+            contract = _CONTRACT_ADAPTER.validate_json(response_text)
+            structured_data = contract.model_dump(mode="json")
+
+            if key_embedding is not None:
+                self._extraction_cache.store(key_embedding, dict(structured_data))
+
             return structured_data
-            
+
+        except ValidationError as e:
+            return {"error": f"Error parsing extraction response: {str(e)}"}
         except Exception as e:
-            return {"error": f"Error structuring contract data: {str(e)}"}
+            return {"error": f"Error extracting contract information: {str(e)}"}
 
     def create_graph_constraints(self) -> Dict[str, Any]:
         """
@@ -285,11 +470,18 @@ Return only the JSON object, no additional text.
         try:
             constraints = []
             
-            # Create constraints
+            # Create constraints, plus indexes on the properties the
+            # generated Cypher routinely filters on so those queries avoid
+            # full label scans
             constraint_queries = [
                 "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Contract) REQUIRE c.id IS UNIQUE;",
                 "CREATE CONSTRAINT IF NOT EXISTS FOR (o:Organization) REQUIRE o.name IS UNIQUE;",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (l:Location) REQUIRE l.fullAddress IS UNIQUE;"
+                "CREATE CONSTRAINT IF NOT EXISTS FOR (l:Location) REQUIRE l.fullAddress IS UNIQUE;",
+                "CREATE INDEX contract_type_idx IF NOT EXISTS FOR (c:Contract) ON (c.contract_type);",
+                "CREATE INDEX contract_date_idx IF NOT EXISTS FOR (c:Contract) ON (c.effective_date);",
+                "CREATE INDEX org_role_idx IF NOT EXISTS FOR (o:Organization) ON (o.role);",
+                "CREATE INDEX loc_country_idx IF NOT EXISTS FOR (l:Location) ON (l.country);",
+                "CREATE FULLTEXT INDEX contract_scope_ft IF NOT EXISTS FOR (c:Contract) ON EACH [c.contract_scope, c.term];"
             ]
             
             for query in constraint_queries:
@@ -307,6 +499,16 @@ Return only the JSON object, no additional text.
         except Exception as e:
             return {"error": f"Error creating constraints: {str(e)}"}
 
+    def _prepare_contract_for_import(self, contract_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Annotate a contract dict with precomputed fullAddress join keys"""
+        prepared = dict(contract_data)
+        for party in prepared.get("parties", []):
+            if isinstance(party.get("location"), dict):
+                party["location"]["fullAddress"] = _full_address(party["location"])
+        if isinstance(prepared.get("governing_law"), dict):
+            prepared["governing_law"]["fullAddress"] = _full_address(prepared["governing_law"])
+        return prepared
+
     def import_contract_to_graph(self, contract_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Import contract data into Neo4j knowledge graph
@@ -320,43 +522,14 @@ Return only the JSON object, no additional text.
         try:
             if "error" in contract_data:
                 return contract_data
-            
-            # Create the import query
-            import_query = """
-WITH $data AS contract_data
-MERGE (contract:Contract {id: randomUUID()})
-SET contract += {
-    contract_type: contract_data.contract_type,
-    effective_date: contract_data.effective_date,
-    term: contract_data.term,
-    contract_scope: contract_data.contract_scope,
-    end_date: contract_data.end_date,
-    total_amount: contract_data.total_amount,
-    governing_law: contract_data.governing_law.state + ' ' + contract_data.governing_law.country
-}
-WITH contract, contract_data
-UNWIND contract_data.parties AS party
-MERGE (p:Organization {name: party.name})
-MERGE (loc:Location {
-    fullAddress: party.location.address + ' ' + 
-    party.location.city + ' ' + 
-    party.location.state + ' ' + 
-    party.location.country
-})
-SET loc += {
-    address: party.location.address,
-    city: party.location.city,
-    state: party.location.state,
-    country: party.location.country
-}
-MERGE (p)-[:LOCATED_AT]->(loc)
-MERGE (p)-[r:HAS_PARTY]->(contract)
-SET r.role = party.role
-"""
-            
+
+            contract_data = self._prepare_contract_for_import(contract_data)
+
             # Execute the import
-            result = self.neo4j_service.execute_query(import_query, parameters={"data": contract_data})
-            
+            result = self.neo4j_service.execute_query(_Q.IMPORT, parameters={"data": contract_data})
+
+            self._query_cache.clear()
+
             return {
                 "message": "Contract imported successfully",
                 "contract_type": contract_data.get("contract_type"),
@@ -367,78 +540,88 @@ SET r.role = party.role
         except Exception as e:
             return {"error": f"Error importing contract: {str(e)}"}
 
-    def get_contract_graph_data(self) -> Dict[str, Any]:
+    def import_contracts_batch(self, contract_list: List[Dict[str, Any]],
+                               batch_size: int = 200) -> Dict[str, Any]:
         """
-        Get contract graph data for visualization
-        
+        Import multiple contracts into the graph with batched UNWIND writes
+
+        One round-trip merges a whole batch instead of one transaction per
+        contract; IDs are pre-assigned in Python so retries are idempotent.
+
+        Args:
+            contract_list: List of structured contract data dictionaries
+            batch_size: Number of contracts merged per transaction
+
         Returns:
-            Graph data including nodes and relationships
+            Result of the import operation
         """
         try:
-            # Get all contracts
-            contracts_query = """
-            MATCH (c:Contract)
-            RETURN c.id as id, c.contract_type as type, c.effective_date as effective_date, 
-                   c.term as term, c.contract_scope as scope, c.end_date as end_date, 
-                   c.total_amount as total_amount, c.governing_law as governing_law
-            """
-            contracts = self.neo4j_service.execute_query(contracts_query)
-            
-            # Get all organizations
-            organizations_query = """
-            MATCH (o:Organization)
-            RETURN o.name as name, o.role as role
-            """
-            organizations = self.neo4j_service.execute_query(organizations_query)
-            
-            # Get all locations
-            locations_query = """
-            MATCH (l:Location)
-            RETURN l.fullAddress as fullAddress, l.address as address, l.city as city, 
-                   l.state as state, l.country as country
-            """
-            locations = self.neo4j_service.execute_query(locations_query)
-            
-            # Get relationships
-            relationships_query = """
-            MATCH (o:Organization)-[r:HAS_PARTY]->(c:Contract)
-            RETURN o.name as organization, c.id as contract, r.role as role
-            """
-            party_relationships = self.neo4j_service.execute_query(relationships_query)
-            
-            location_relationships_query = """
-            MATCH (o:Organization)-[:LOCATED_AT]->(l:Location)
-            RETURN o.name as organization, l.fullAddress as location
-            """
-            location_relationships = self.neo4j_service.execute_query(location_relationships_query)
-            
+            contracts = [
+                self._prepare_contract_for_import(c)
+                for c in contract_list if "error" not in c
+            ]
+            if not contracts:
+                return {"error": "No valid contracts to import"}
+
+            for contract_data in contracts:
+                contract_data.setdefault("id", str(uuid.uuid4()))
+
+            self.neo4j_service.bulk_import(
+                _Q.IMPORT_BATCH, contracts,
+                param_name="contracts", chunk_size=batch_size
+            )
+
+            self._query_cache.clear()
+
             return {
-                "contracts": contracts,
-                "organizations": organizations,
-                "locations": locations,
-                "party_relationships": party_relationships,
-                "location_relationships": location_relationships,
-                "total_contracts": len(contracts),
-                "total_organizations": len(organizations),
-                "total_locations": len(locations)
+                "message": "Contracts imported successfully",
+                "contracts_imported": len(contracts)
             }
-            
+
         except Exception as e:
-            return {"error": f"Error getting graph data: {str(e)}"}
+            return {"error": f"Error importing contracts batch: {str(e)}"}
 
-    def query_contracts(self, question: str) -> Dict[str, Any]:
+    def get_contract_graph_data(self, offset: int = 0, limit: int = 1000) -> Dict[str, Any]:
         """
-        Query the contract knowledge graph using natural language
-        
+        Get contract graph data for visualization
+
+        Each node list is paginated so the backend never materializes an
+        unbounded result set; totals come from count subqueries rather than
+        Python-side len() over full lists.
+
         Args:
-            question: Natural language question about contracts
-            
+            offset: Number of nodes to skip per category
+            limit: Maximum nodes returned per category
+
         Returns:
-            Query results and generated Cypher
+            Graph data including nodes, relationships, and exact totals
         """
         try:
-            # Generate Cypher query from natural language
-            cypher_prompt = f"""
+            # Fetch nodes and relationships as five collected aggregates in a
+            # single query, collapsing five network round-trips into one
+            result = self.neo4j_service.execute_query(_Q.GRAPH_DATA, parameters={
+                "offset": offset,
+                "limit": limit
+            })
+            graph = result[0] if result else {}
+
+            return {
+                "contracts": graph.get("contracts", []),
+                "organizations": graph.get("organizations", []),
+                "locations": graph.get("locations", []),
+                "party_relationships": graph.get("party_relationships", []),
+                "location_relationships": graph.get("location_relationships", []),
+                "total_contracts": graph.get("total_contracts", 0),
+                "total_organizations": graph.get("total_organizations", 0),
+                "total_locations": graph.get("total_locations", 0)
+            }
+
+        except Exception as e:
+            return {"error": f"Error getting graph data: {str(e)}"}
+
+    def _build_cypher_prompt(self, question: str) -> str:
+        """Build the Cypher-generation prompt for a question"""
+        return f"""
 Generate a Cypher query to answer this question about contracts: "{question}"
 
 Available schema:
@@ -449,39 +632,129 @@ Available schema:
 
 Return only the Cypher query, no explanations.
 """
-            
-            messages = [{"role": "user", "content": cypher_prompt}]
-            cypher_query = self.gemini_service.chat(messages)
-            
-            # Clean the Cypher query
-            cypher_query = cypher_query.strip()
-            if cypher_query.startswith("```cypher"):
-                cypher_query = cypher_query.replace("```cypher", "").replace("```", "").strip()
-            elif cypher_query.startswith("```"):
-                cypher_query = cypher_query.replace("```", "").strip()
-            
-            # Execute the query
-            results = self.neo4j_service.execute_query(cypher_query)
-            
-            # Generate a natural language answer
-            answer_prompt = f"""
+
+    def _build_answer_prompt(self, question: str, results: List[Dict]) -> str:
+        """Build the answer-generation prompt over query results
+
+        Results are serialized compactly and capped at 50 rows; indented JSON
+        spends prompt tokens on whitespace and risks truncating large result
+        sets mid-object.
+        """
+        return f"""
 Based on the following query results, provide a clear answer to the question: "{question}"
 
-Query results: {json.dumps(results, indent=2)}
+Query results: {orjson.dumps(results[:50]).decode()}
 
 Provide a concise, natural language answer.
 """
-            
-            answer_messages = [{"role": "user", "content": answer_prompt}]
-            answer = self.gemini_service.chat(answer_messages)
-            
+
+    async def query_contracts_async(self, question: str) -> Dict[str, Any]:
+        """
+        Async variant of query_contracts for concurrent question batches
+
+        Args:
+            question: Natural language question about contracts
+
+        Returns:
+            Query results and generated Cypher
+        """
+        try:
+            messages = [{"role": "user", "content": self._build_cypher_prompt(question)}]
+            cypher_query = await self.gemini_service.achat(messages)
+            cypher_query = _strip_fence(cypher_query)
+
+            # The blocking driver call runs in a worker thread so the event
+            # loop keeps other questions in flight
+            results = await asyncio.to_thread(self.neo4j_service.execute_query, cypher_query)
+
+            answer_messages = [{"role": "user", "content": self._build_answer_prompt(question, results)}]
+            answer = await self.gemini_service.achat(answer_messages)
+
             return {
                 "question": question,
                 "cypher_query": cypher_query,
                 "results": results,
                 "answer": answer.strip()
             }
+
+        except Exception as e:
+            return {"error": f"Error querying contracts: {str(e)}"}
+
+    def query_contracts_batch(self, questions: List[str],
+                              max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Answer a batch of questions concurrently
+
+        Gemini round-trips dominate query latency, so overlapping them gives
+        near-linear speedup; concurrency is capped to respect rate limits.
+
+        Args:
+            questions: Natural language questions about contracts
+            max_concurrency: Maximum questions in flight at once
+
+        Returns:
+            One result per question, in order
+        """
+        async def _run():
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def _one(question):
+                async with semaphore:
+                    return await self.query_contracts_async(question)
+
+            return await asyncio.gather(*[_one(q) for q in questions])
+
+        return asyncio.run(_run())
+
+    def query_contracts(self, question: str) -> Dict[str, Any]:
+        """
+        Query the contract knowledge graph using natural language
+
+        Args:
+            question: Natural language question about contracts
+
+        Returns:
+            Query results and generated Cypher
+        """
+        try:
+            # Serve exact repeats from the cache, skipping two Gemini calls
+            # and the Neo4j query
+            cache_key = question.strip().lower()
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                cached_at, cached_result = cached
+                if time.time() - cached_at < self._query_cache_ttl:
+                    self._query_cache.move_to_end(cache_key)
+                    return cached_result
+                del self._query_cache[cache_key]
+
+            # Generate Cypher query from natural language
+            messages = [{"role": "user", "content": self._build_cypher_prompt(question)}]
+            cypher_query = self.gemini_service.chat(messages)
+
+            # Clean the Cypher query
+            cypher_query = _strip_fence(cypher_query)
+
+            # Execute the query
+            results = self.neo4j_service.execute_query(cypher_query)
+
+            # Generate a natural language answer
+            answer_messages = [{"role": "user", "content": self._build_answer_prompt(question, results)}]
+            answer = self.gemini_service.chat(answer_messages)
             
+            result = {
+                "question": question,
+                "cypher_query": cypher_query,
+                "results": results,
+                "answer": answer.strip()
+            }
+
+            self._query_cache[cache_key] = (time.time(), result)
+            if len(self._query_cache) > self._query_cache_size:
+                self._query_cache.popitem(last=False)
+
+            return result
+
         except Exception as e:
             return {"error": f"Error querying contracts: {str(e)}"}
 
@@ -492,7 +765,7 @@ Provide a concise, natural language answer.
         Returns:
             Sample contract text
         """
-        return self.sample_contract
+        return SAMPLE_CONTRACT
 
     def clear_contract_data(self) -> Dict[str, Any]:
         """
@@ -502,20 +775,15 @@ Provide a concise, natural language answer.
             Result of the clear operation
         """
         try:
-            # Clear all contract-related nodes and relationships
-            clear_query = """
-            MATCH (c:Contract)
-            DETACH DELETE c
-            
-            MATCH (o:Organization)
-            DETACH DELETE o
-            
-            MATCH (l:Location)
-            DETACH DELETE l
-            """
-            
-            self.neo4j_service.execute_query(clear_query)
-            
+            # Clear all contract-related nodes and relationships in one
+            # statement; the driver only runs a single statement per query,
+            # so the previous multi-MATCH string never deleted everything.
+            # Batched transactions keep memory bounded on large graphs, and
+            # CALL ... IN TRANSACTIONS must run on an auto-commit transaction
+            self.neo4j_service.execute_autocommit(_Q.CLEAR)
+
+            self._query_cache.clear()
+
             return {
                 "message": "Contract data cleared successfully",
                 "status": "success"
@@ -533,26 +801,7 @@ Provide a concise, natural language answer.
         """
         try:
             # Get basic counts
-            stats_query = """
-            MATCH (c:Contract)
-            WITH count(c) as contract_count
-            
-            MATCH (o:Organization)
-            WITH contract_count, count(o) as org_count
-            
-            MATCH (l:Location)
-            WITH contract_count, org_count, count(l) as location_count
-            
-            MATCH (o:Organization)-[:HAS_PARTY]->(c:Contract)
-            WITH contract_count, org_count, location_count, count(*) as party_relationships
-            
-            MATCH (o:Organization)-[:LOCATED_AT]->(l:Location)
-            WITH contract_count, org_count, location_count, party_relationships, count(*) as location_relationships
-            
-            RETURN contract_count, org_count, location_count, party_relationships, location_relationships
-            """
-            
-            result = self.neo4j_service.execute_query(stats_query)
+            result = self.neo4j_service.execute_query(_Q.STATS)
             
             if result:
                 stats = result[0]
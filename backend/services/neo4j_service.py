@@ -1,7 +1,10 @@
-from neo4j import GraphDatabase, basic_auth
+from neo4j import GraphDatabase, Result, RoutingControl, basic_auth
 from typing import List, Dict, Any, Optional, Tuple
 import os
 import json
+import asyncio
+import heapq
+import threading
 from config import NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD
 
 class Neo4jService:
@@ -14,27 +17,68 @@ class Neo4jService:
         self.username = NEO4J_USERNAME
         self.password = NEO4J_PASSWORD
         
-        # Initialize driver
+        # Initialize driver; explicit pool sizing so concurrent requests
+        # reuse warm Bolt connections instead of re-handshaking, with a
+        # bounded acquisition wait under load
         self.driver = GraphDatabase.driver(
             self.uri,
             auth=basic_auth(self.username, self.password),
-            notifications_min_severity="OFF"
+            notifications_min_severity="OFF",
+            max_connection_pool_size=int(os.getenv("NEO4J_POOL_SIZE", "50")),
+            connection_acquisition_timeout=float(os.getenv("NEO4J_ACQ_TIMEOUT", "60")),
+            connection_timeout=15,
+            max_connection_lifetime=3600,
+            max_transaction_retry_time=30
         )
         
+        # Target database; naming it explicitly skips the driver's
+        # per-query routing discovery
+        self.database = os.getenv("NEO4J_DATABASE", "neo4j")
+
+        # Per-thread long-lived read sessions for the search hot path
+        self._read_local = threading.local()
+
         # Initialize indexes
         self._create_indexes()
-    
+
+        # Prime plan and page caches so the first user request doesn't pay
+        # the cold-start penalty
+        self._warm_caches()
+
+    def _warm_caches(self):
+        """
+        Run each hot search query once with dummy parameters
+
+        The first execution of a Cypher string pays plan compilation and cold
+        page-cache reads; doing it at boot moves that cost out of the first
+        user request. Results are discarded and failures ignored (e.g. empty
+        database or missing indexes).
+        """
+        try:
+            # Cosine indexes reject zero-norm query vectors, so the dummy
+            # must be non-zero for the warmup queries to actually execute
+            dummy_vector = [0.01] * 384
+            self.vector_search(dummy_vector, k=1)
+            self.keyword_search("warmup", k=1)
+            self.hybrid_search(dummy_vector, "warmup", k=1)
+            self.parent_retrieval(dummy_vector, k=1)
+        except Exception as e:
+            print(f"Error warming caches: {e}")
+
     def _create_indexes(self):
         """Create necessary indexes for the application"""
         try:
-            # Vector indexes - using existing names from the database
+            # Vector indexes - using existing names from the database.
+            # INT8 quantization cuts the per-vector footprint during kNN
+            # scoring 4x; full-precision vectors are still fetched on refine
             self.execute_query("""
                 CREATE VECTOR INDEX chunk_embeddings IF NOT EXISTS
                 FOR (c:Chunk)
                 ON c.embedding
                 OPTIONS {indexConfig: {
                     `vector.dimensions`: 384,
-                    `vector.similarity_function`: 'cosine'
+                    `vector.similarity_function`: 'cosine',
+                    `vector.quantization.type`: 'INT8'
                 }}
             """)
             
@@ -44,7 +88,8 @@ class Neo4jService:
                 ON c.embedding
                 OPTIONS {indexConfig: {
                     `vector.dimensions`: 384,
-                    `vector.similarity_function`: 'cosine'
+                    `vector.similarity_function`: 'cosine',
+                    `vector.quantization.type`: 'INT8'
                 }}
             """)
             
@@ -54,7 +99,8 @@ class Neo4jService:
                 ON n.embedding
                 OPTIONS {indexConfig: {
                     `vector.dimensions`: 384,
-                    `vector.similarity_function`: 'cosine'
+                    `vector.similarity_function`: 'cosine',
+                    `vector.quantization.type`: 'INT8'
                 }}
             """)
             
@@ -69,14 +115,36 @@ class Neo4jService:
             except:
                 pass
             
-            # Constraints
+            # Constraints; every MERGE key gets one so merges are index
+            # seeks instead of label scans
             self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (c:Contract) REQUIRE c.id IS UNIQUE")
             self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (o:Organization) REQUIRE o.name IS UNIQUE")
             self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (l:Location) REQUIRE l.fullAddress IS UNIQUE")
+            self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (e:__Entity__) REQUIRE e.name IS UNIQUE")
+            self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (c:Chunk) REQUIRE c.id IS UNIQUE")
+            self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE")
+            self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (p:Parent) REQUIRE p.id IS UNIQUE")
+            self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (c:Child) REQUIRE c.id IS UNIQUE")
+            self.execute_query("CREATE CONSTRAINT IF NOT EXISTS FOR (p:PDF) REQUIRE p.id IS UNIQUE")
             
         except Exception as e:
             print(f"Error creating indexes: {e}")
     
+    @staticmethod
+    def _routing_for(query: str) -> RoutingControl:
+        """
+        Pick READ routing for pure read queries so replicas can serve them
+
+        Searches and statistics start with MATCH or an index procedure call
+        and contain no write clause; anything with a write clause (including
+        MATCH ... DETACH DELETE) stays on the writer.
+        """
+        upper = query.lstrip().upper()
+        if upper.startswith(("MATCH", "CALL DB.INDEX")):
+            if not any(clause in upper for clause in ("CREATE", "MERGE", "DELETE", "SET ", "REMOVE ")):
+                return RoutingControl.READ
+        return RoutingControl.WRITE
+
     def execute_query(self, query: str, parameters: Dict = None) -> List[Dict]:
         """
         Execute a Cypher query
@@ -85,31 +153,130 @@ class Neo4jService:
             query: Cypher query string
             parameters: Query parameters
             
+        Returns:
+            List of result records
+
+        Raises:
+            neo4j.exceptions.Neo4jError: on query failure; the driver already
+            retries transient errors with backoff up to
+            max_transaction_retry_time, so no manual sleep-and-retry here
+        """
+        # Result.data materializes records inside the driver, skipping a
+        # second Python-level pass over the record list
+        return self.driver.execute_query(
+            query, parameters or {},
+            database_=self.database,
+            routing_=self._routing_for(query),
+            result_transformer_=Result.data
+        )
+    
+    def execute_query_values(self, query: str, parameters: Dict = None) -> List[List[Any]]:
+        """
+        Execute a Cypher query returning rows as value lists, not dicts
+
+        Skips the per-record dict with string keys that execute_query builds;
+        for large result sets where the caller knows the column order, this
+        roughly halves Python-side materialization cost.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+
+        Returns:
+            List of rows, each a list of values in RETURN order
+        """
+        return self.driver.execute_query(
+            query, parameters or {},
+            database_=self.database,
+            routing_=self._routing_for(query),
+            result_transformer_=Result.values
+        )
+
+    def execute_autocommit(self, query: str, parameters: Dict = None):
+        """
+        Run a query in an implicit (auto-commit) transaction
+
+        CALL { ... } IN TRANSACTIONS manages its own inner commits and is
+        rejected inside the managed transactions that execute_query uses, so
+        statements built on it must go through here.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+        """
+        with self.driver.session(database=self.database) as session:
+            session.run(query, parameters or {}).consume()
+
+    def bulk_import(self, query: str, rows: List[Dict], param_name: str = "rows",
+                    chunk_size: int = 500):
+        """
+        Run a batched UNWIND write reusing one session and bolt connection
+
+        execute_query acquires a session per call; for bulk ingestion this
+        commits once per chunk over a single connection instead, and consumes
+        results without buffering records.
+
+        Args:
+            query: Cypher query expecting the chunk list as $<param_name>
+            rows: Full list of row dictionaries to import
+            param_name: Name of the list parameter in the query
+            chunk_size: Rows committed per transaction
+
+        Raises:
+            neo4j.exceptions.Neo4jError: on write failure, so callers never
+            report success for an import that wrote nothing; execute_write
+            already retries transient errors internally
+        """
+        with self.driver.session(database=self.database) as session:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                session.execute_write(
+                    lambda tx, batch=chunk: tx.run(query, {param_name: batch}).consume()
+                )
+
+    def read_query(self, query: str, parameters: Dict = None) -> List[Dict]:
+        """
+        Run a read query on a long-lived per-thread session
+
+        Skips the session acquire/release that execute_query pays per call,
+        so the repeated small searches reuse one session and keep their
+        server-side plan cache entries warm. The cached session is dropped
+        and recreated if it turns out to be dead.
+
+        Args:
+            query: Cypher read query string
+            parameters: Query parameters
+
         Returns:
             List of result records
         """
-        import time
-        
         try:
-            if parameters is None:
-                parameters = {}
-            
-            records, summary, keys = self.driver.execute_query(query, parameters)
-            return [record.data() for record in records]
-            
+            session = getattr(self._read_local, "session", None)
+            if session is None:
+                session = self.driver.session(
+                    database=self.database, default_access_mode="READ"
+                )
+                self._read_local.session = session
+
+            try:
+                return session.run(query, parameters or {}).data()
+            except Exception:
+                # Session may have expired; rebuild it once and retry
+                self._read_local.session = None
+                try:
+                    session.close()
+                except Exception:
+                    pass
+                session = self.driver.session(
+                    database=self.database, default_access_mode="READ"
+                )
+                self._read_local.session = session
+                return session.run(query, parameters or {}).data()
+
         except Exception as e:
-            error_msg = str(e)
-            if "AuthenticationRateLimit" in error_msg:
-                print(f"Authentication rate limit hit, waiting 5 seconds...")
-                time.sleep(5)
-                return []
-            elif "Unauthorized" in error_msg:
-                print(f"Authentication failed. Check Neo4j credentials.")
-                return []
-            else:
-                print(f"Error executing query: {e}")
-                return []
-    
+            print(f"Error executing read query: {e}")
+            return []
+
     def store_document_chunks(self, doc_id: str, chunks: List[str], embeddings: List[List[float]]):
         """
         Store document chunks with embeddings in Neo4j
@@ -120,25 +287,33 @@ class Neo4jService:
             embeddings: List of embedding vectors
         """
         try:
-            # Create document node and chunks
+            # Row-per-chunk payload so chunks/embeddings may be any iterable
+            # (e.g. a generator zipped with streamed embeddings) and writes
+            # commit in bounded batches instead of one giant transaction
             cypher_query = '''
-            MERGE (doc:Document {id: $doc_id})
-            WITH doc, $chunks as chunks, $embeddings as embeddings, range(0, size($chunks) - 1) AS indices
-            UNWIND indices AS i
-            MERGE (c:Chunk {id: $doc_id + '-' + toString(i)})
-            SET c.text = chunks[i], 
-                c.embedding = embeddings[i],
-                c.index = i,
-                c.doc_id = $doc_id
+            UNWIND $rows AS row
+            MERGE (doc:Document {id: row.doc_id})
+            MERGE (c:Chunk {id: row.id})
+            SET c.text = row.text,
+                c.embedding = row.embedding,
+                c.index = row.index,
+                c.doc_id = row.doc_id
             MERGE (doc)-[:HAS_CHUNK]->(c)
             '''
-            
-            self.execute_query(cypher_query, {
-                "doc_id": doc_id,
-                "chunks": chunks,
-                "embeddings": embeddings
-            })
-            
+
+            rows = [
+                {
+                    "id": f"{doc_id}-{i}",
+                    "doc_id": doc_id,
+                    "text": chunk,
+                    "embedding": embedding,
+                    "index": i
+                }
+                for i, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+            ]
+
+            self.bulk_import(cypher_query, rows, chunk_size=256)
+
         except Exception as e:
             print(f"Error storing document chunks: {e}")
     
@@ -155,31 +330,45 @@ class Neo4jService:
         try:
             # Clear existing data for this document
             self.execute_query("MATCH (doc:PDF {id: $doc_id})-[:HAS_PARENT]->(p:Parent)-[:HAS_CHILD]->(c:Child) DETACH DELETE p, c", {"doc_id": doc_id})
-            
+
+            # All parents travel in one UNWIND payload so ingestion costs one
+            # round-trip per chunk of parents instead of one per parent
             cypher_import_query = """
-            MERGE (pdf:PDF {id: $pdf_id})
-            MERGE (p:Parent {id: $pdf_id + '-' + $parent_id})
-            SET p.text = $parent_text
-            MERGE (pdf)-[:HAS_PARENT]->(p)
-            WITH p, $children AS children, $embeddings as embeddings
-            UNWIND range(0, size(children) - 1) AS child_index
-            MERGE (c:Child {id: $pdf_id + '-' + $parent_id + '-' + toString(child_index)})
-            SET c.text = children[child_index], 
-                c.embedding = embeddings[child_index],
-                c.index = child_index
-            MERGE (p)-[:HAS_CHILD]->(c)
+            UNWIND $parents AS p
+            MERGE (pdf:PDF {id: p.pdf_id})
+            MERGE (parent:Parent {id: p.id})
+            SET parent.text = p.text
+            MERGE (pdf)-[:HAS_PARENT]->(parent)
+            WITH parent, p.children AS children
+            UNWIND children AS c
+            MERGE (child:Child {id: c.id})
+            SET child.text = c.text,
+                child.embedding = c.embedding,
+                child.index = c.index
+            MERGE (parent)-[:HAS_CHILD]->(child)
             """
-            
+
+            parents = []
             for i, (parent_text, child_texts) in enumerate(parent_child_pairs):
                 if i < len(child_embeddings):
-                    self.execute_query(cypher_import_query, {
+                    parent_id = f"{doc_id}-{i}"
+                    parents.append({
                         "pdf_id": doc_id,
-                        "parent_id": str(i),
-                        "parent_text": parent_text,
-                        "children": child_texts,
-                        "embeddings": child_embeddings[i]
+                        "id": parent_id,
+                        "text": parent_text,
+                        "children": [
+                            {
+                                "id": f"{parent_id}-{j}",
+                                "text": child_text,
+                                "embedding": child_embeddings[i][j],
+                                "index": j
+                            }
+                            for j, child_text in enumerate(child_texts)
+                        ]
                     })
-                    
+
+            self.bulk_import(cypher_import_query, parents, param_name="parents", chunk_size=500)
+
         except Exception as e:
             print(f"Error storing parent-child chunks: {e}")
     
@@ -203,7 +392,7 @@ class Neo4jService:
             ORDER BY score DESC
             '''
             
-            return self.execute_query(query, {
+            return self.read_query(query, {
                 "index_name": index_name,
                 "k": k,
                 "query_embedding": query_embedding
@@ -233,7 +422,7 @@ class Neo4jService:
             ORDER BY score DESC
             '''
             
-            return self.execute_query(cypher_query, {
+            return self.read_query(cypher_query, {
                 "index_name": index_name,
                 "query": query,
                 "k": k
@@ -243,45 +432,53 @@ class Neo4jService:
             print(f"Error in keyword search: {e}")
             return []
     
-    def hybrid_search(self, query_embedding: List[float], query: str, k: int = 4) -> List[Dict]:
+    def hybrid_search(self, query_embedding: List[float], query: str, k: int = 4,
+                      include_embeddings: bool = False) -> List[Dict]:
         """
         Perform hybrid search combining vector and keyword search
-        
+
         Args:
             query_embedding: Query embedding vector
             query: Search query string
             k: Number of results to return
-            
+            include_embeddings: Also return each chunk's stored embedding;
+                off by default since the vectors are kilobytes per row and
+                only callers doing their own similarity math want them
+
         Returns:
             List of documents with combined scores
         """
         try:
+            # Reciprocal-rank fusion: each branch contributes 1/(60+rank), so
+            # only ranks matter and no per-branch max() normalization pass is
+            # needed; sum() both fuses and dedups in one aggregate
             hybrid_query = '''
             CALL {
-                // vector index
-                CALL db.index.vector.queryNodes('chunk_embeddings', $k, $query_embedding) 
+                // vector index; queryNodes yields in score order, so the
+                // collect position is the rank
+                CALL db.index.vector.queryNodes('chunk_embeddings', $k, $query_embedding)
                 YIELD node, score
-                WITH collect({node:node, score:score}) AS nodes, max(score) AS max
-                UNWIND nodes AS n
-                // We use 0 as min
-                RETURN n.node AS node, (n.score / max) AS score
-                UNION
+                WITH collect(node) AS nodes
+                UNWIND range(0, size(nodes) - 1) AS rank
+                RETURN nodes[rank] AS node, rank
+                UNION ALL
                 // keyword index
                 CALL db.index.fulltext.queryNodes('chunk_fulltext', $query, {limit: $k})
                 YIELD node, score
-                WITH collect({node:node, score:score}) AS nodes, max(score) AS max
-                UNWIND nodes AS n
-                // We use 0 as min
-                RETURN n.node AS node, (n.score / max) AS score
+                WITH collect(node) AS nodes
+                UNWIND range(0, size(nodes) - 1) AS rank
+                RETURN nodes[rank] AS node, rank
             }
-            // dedup
-            WITH node, max(score) AS score 
-            ORDER BY score DESC 
+            WITH node, sum(1.0 / (60 + rank)) AS score
+            ORDER BY score DESC
             LIMIT $k
             RETURN node.text AS text, score, node.index AS index, node.id AS id
             '''
-            
-            return self.execute_query(hybrid_query, {
+            if include_embeddings:
+                hybrid_query += ", node.embedding AS embedding"
+
+
+            return self.read_query(hybrid_query, {
                 "query_embedding": query_embedding,
                 "query": query,
                 "k": k
@@ -291,6 +488,41 @@ class Neo4jService:
             print(f"Error in hybrid search: {e}")
             return []
     
+    async def ahybrid_search(self, query_embedding: List[float], query: str, k: int = 4) -> List[Dict]:
+        """
+        Hybrid search with the two index lookups running concurrently
+
+        The vector and fulltext branches are independent, so they run as two
+        parallel queries on worker threads instead of serial subqueries
+        inside one Cypher statement, and are fused client-side with the same
+        reciprocal-rank formula as hybrid_search.
+
+        Args:
+            query_embedding: Query embedding vector
+            query: Search query string
+            k: Number of results to return
+
+        Returns:
+            List of documents with fused scores
+        """
+        try:
+            vector_hits, keyword_hits = await asyncio.gather(
+                asyncio.to_thread(self.vector_search, query_embedding, "chunk_embeddings", k),
+                asyncio.to_thread(self.keyword_search, query, "chunk_fulltext", k)
+            )
+
+            fused = {}
+            for hits in (vector_hits, keyword_hits):
+                for rank, hit in enumerate(hits):
+                    entry = fused.setdefault(hit["id"], {**hit, "score": 0.0})
+                    entry["score"] += 1.0 / (60 + rank)
+
+            return heapq.nlargest(k, fused.values(), key=lambda hit: hit["score"])
+
+        except Exception as e:
+            print(f"Error in async hybrid search: {e}")
+            return []
+
     def parent_retrieval(self, query_embedding: List[float], k: int = 4, index_name: str = "child_chunks") -> List[Dict]:
         """
         Perform parent retrieval using child embeddings
@@ -304,17 +536,21 @@ class Neo4jService:
             List of parent documents
         """
         try:
+            # Children arrive score-ordered, so head(collect(score)) takes
+            # each parent's best child without a max() re-aggregation pass
             retrieval_query = """
             CALL db.index.vector.queryNodes($index_name, $k_mult, $query_embedding)
             YIELD node, score
-            MATCH (node)<-[:HAS_CHILD]-(parent)
-            WITH parent, max(score) AS score
+            WITH node, score
+            ORDER BY score DESC
+            MATCH (parent)-[:HAS_CHILD]->(node)
+            WITH parent, head(collect(score)) AS score
             RETURN parent.text AS text, score
             ORDER BY score DESC
             LIMIT toInteger($k)
             """
             
-            return self.execute_query(retrieval_query, {
+            return self.read_query(retrieval_query, {
                 "query_embedding": query_embedding,
                 "k": k,
                 "k_mult": k * 4,
@@ -339,12 +575,12 @@ class Neo4jService:
                 entity_query = """
                 UNWIND $entities AS entity
                 MERGE (e:__Entity__ {name: entity.entity_name})
-                SET e += {
+                ON CREATE SET e += {
                     type: entity.entity_type,
                     description: entity.entity_description
                 }
                 """
-                self.execute_query(entity_query, {"entities": entities})
+                self.bulk_import(entity_query, entities, param_name="entities", chunk_size=1000)
             
             # Store relationships
             if relationships:
@@ -357,7 +593,7 @@ class Neo4jService:
                     strength: rel.relationship_strength
                 }]->(t)
                 """
-                self.execute_query(rel_query, {"relationships": relationships})
+                self.bulk_import(rel_query, relationships, param_name="relationships", chunk_size=1000)
                 
         except Exception as e:
             print(f"Error storing entities and relationships: {e}")
@@ -388,20 +624,19 @@ class Neo4jService:
             RETURN {start: label, type: property, end: toString(other_node)} AS output
             """
             
-            nodes = self.execute_query(node_query)
-            relationships = self.execute_query(rel_query)
-            
+            # Single-column results; value rows skip the per-record dict
+            nodes = self.execute_query_values(node_query)
+            relationships = self.execute_query_values(rel_query)
+
             schema_parts = ["Node properties:"]
-            for node in nodes:
-                output = node.get("output", {})
+            for (output,) in nodes:
                 label = output.get("labels", "")
                 props = output.get("properties", [])
                 prop_str = ", ".join([f"{p['property']}: {p['type']}" for p in props])
                 schema_parts.append(f"{label} {{{prop_str}}}")
-            
+
             schema_parts.append("\nThe relationships:")
-            for rel in relationships:
-                output = rel.get("output", {})
+            for (output,) in relationships:
                 schema_parts.append(f"(:{output.get('start', '')})-[:{output.get('type', '')}]->(:{output.get('end', '')})")
             
             return "\n".join(schema_parts)
@@ -417,32 +652,29 @@ class Neo4jService:
             Dictionary with statistics
         """
         try:
-            stats = {}
-            
-            # Count nodes by label
-            node_counts = self.execute_query("""
-                MATCH (n)
-                RETURN labels(n)[0] AS label, count(n) AS count
-                ORDER BY count DESC
-            """)
-            stats["node_counts"] = {item["label"]: item["count"] for item in node_counts}
-            
-            # Count relationships by type
-            rel_counts = self.execute_query("""
-                MATCH ()-[r]->()
-                RETURN type(r) AS type, count(r) AS count
-                ORDER BY count DESC
+            # apoc.meta.stats serves counts from store metadata in O(1),
+            # replacing three whole-graph scans
+            result = self.execute_query("""
+                CALL apoc.meta.stats()
+                YIELD labels, relTypesCount, nodeCount, relCount
+                RETURN labels, relTypesCount, nodeCount, relCount
             """)
-            stats["relationship_counts"] = {item["type"]: item["count"] for item in rel_counts}
-            
-            # Total counts
-            total_nodes = self.execute_query("MATCH (n) RETURN count(n) AS count")
-            total_rels = self.execute_query("MATCH ()-[r]->() RETURN count(r) AS count")
-            
-            stats["total_nodes"] = total_nodes[0]["count"] if total_nodes else 0
-            stats["total_relationships"] = total_rels[0]["count"] if total_rels else 0
-            
-            return stats
+
+            if result:
+                meta = result[0]
+                return {
+                    "node_counts": meta.get("labels", {}),
+                    "relationship_counts": meta.get("relTypesCount", {}),
+                    "total_nodes": meta.get("nodeCount", 0),
+                    "total_relationships": meta.get("relCount", 0),
+                }
+
+            return {
+                "node_counts": {},
+                "relationship_counts": {},
+                "total_nodes": 0,
+                "total_relationships": 0,
+            }
             
         except Exception as e:
             return {"error": f"Error getting statistics: {str(e)}"}
@@ -1,17 +1,47 @@
 import pdfplumber
 import requests
+import shutil
+from requests.adapters import HTTPAdapter
+
+try:
+    # PyMuPDF's C core extracts plain text ~10x faster than pdfplumber;
+    # pdfplumber stays as the fallback parser
+    import fitz
+except ImportError:
+    fitz = None
 import os
 import re
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 import tiktoken
 from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+
+def _extract_page(pdf_path: str, page_number: int) -> str:
+    """Extract one page's text; top-level so worker processes can pickle it"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return pdf.pages[page_number].extract_text() or ""
+
+# Shared HTTP session so repeated downloads reuse pooled TCP+TLS
+# connections instead of re-handshaking per call
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+_HTTP.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+# Section titles: lines starting with digits, an optional uppercase letter,
+# a dot, 1-3 spaces, then up to 60 characters; compiled once at import. The
+# capturing group makes re.split return titles interleaved with bodies.
+_TITLE_RE = re.compile(r"(\n\d+[A-Z]?\. {1,3}.{0,60}\n)")
+
+# Shared encoder; construction loads the BPE ranks, so pay that once per
+# process rather than per PDFService instance
+_ENCODING = tiktoken.encoding_for_model("gpt-4")
 
 class PDFService:
     def __init__(self):
         """
         Initialize PDF service
         """
-        self.encoding = tiktoken.encoding_for_model("gpt-4")
+        self.encoding = _ENCODING
         os.makedirs("downloads", exist_ok=True)
     
     def download_pdf(self, url: str) -> str:
@@ -34,14 +64,15 @@ class PDFService:
             
             file_path = os.path.join("downloads", filename)
             
-            # Download the PDF
-            response = requests.get(url, stream=True)
+            # Download the PDF; copyfileobj moves 1 MiB buffers in C
+            # instead of iterating 8 KiB chunks in Python
+            response = _HTTP.get(url, stream=True, timeout=30)
             response.raise_for_status()
-            
+            response.raw.decode_content = True
+
             with open(file_path, "wb") as pdf_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    pdf_file.write(chunk)
-            
+                shutil.copyfileobj(response.raw, pdf_file, length=1 << 20)
+
             return file_path
             
         except Exception as e:
@@ -58,63 +89,87 @@ class PDFService:
             Extracted text content
         """
         try:
-            text = ""
-            
+            if fitz is not None:
+                with fitz.open(pdf_path) as doc:
+                    return "\n".join(page.get_text("text") for page in doc).strip()
+
             with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            return text.strip()
-            
+                num_pages = len(pdf.pages)
+
+                # Page parsing is CPU-bound pure Python; below the process
+                # startup break-even just extract serially
+                if num_pages < 8:
+                    page_texts = [page.extract_text() or "" for page in pdf.pages]
+                    return "\n".join(t for t in page_texts if t).strip()
+
+            with ProcessPoolExecutor(max_workers=min(num_pages, os.cpu_count() or 1)) as executor:
+                page_texts = executor.map(_extract_page, [pdf_path] * num_pages, range(num_pages))
+                return "\n".join(t for t in page_texts if t).strip()
+
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
     
-    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 40, 
+    def iter_chunks(self, text: str, chunk_size: int = 500, overlap: int = 40,
+                    split_on_whitespace_only: bool = True) -> Iterator[str]:
+        """
+        Lazily yield non-empty text chunks with overlap
+
+        Generator form of chunk_text; streaming consumers avoid holding a
+        second full copy of the document in memory.
+
+        Args:
+            text: Text to chunk
+            chunk_size: Size of each chunk in characters
+            overlap: Overlap between chunks in characters
+            split_on_whitespace_only: Whether to split only on whitespace
+
+        Yields:
+            Non-empty text chunks
+        """
+        index = 0
+
+        while index < len(text):
+            if split_on_whitespace_only:
+                # Rightmost space at or before index-overlap, scanned in C
+                # by rfind; the previous per-character Python loop cost one
+                # opcode per character walked
+                prev_whitespace = text.rfind(" ", 0, max(0, index - overlap) + 1)
+                if prev_whitespace == -1:
+                    prev_whitespace = 0
+
+                next_whitespace = text.find(" ", index + chunk_size)
+                if next_whitespace == -1:
+                    next_whitespace = len(text)
+
+                chunk = text[prev_whitespace:next_whitespace].strip()
+                if chunk:
+                    yield chunk
+                index = next_whitespace + 1
+            else:
+                start = max(0, index - overlap + 1)
+                end = min(index + chunk_size + overlap, len(text))
+                chunk = text[start:end].strip()
+                if chunk:
+                    yield chunk
+                index += chunk_size
+
+    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 40,
                    split_on_whitespace_only: bool = True) -> List[str]:
         """
         Split text into chunks with overlap
-        
+
         Args:
             text: Text to chunk
             chunk_size: Size of each chunk in characters
             overlap: Overlap between chunks in characters
             split_on_whitespace_only: Whether to split only on whitespace
-            
+
         Returns:
             List of text chunks
         """
         try:
-            chunks = []
-            index = 0
+            return list(self.iter_chunks(text, chunk_size, overlap, split_on_whitespace_only))
 
-            while index < len(text):
-                if split_on_whitespace_only:
-                    prev_whitespace = 0
-                    left_index = index - overlap
-                    while left_index >= 0:
-                        if text[left_index] == " ":
-                            prev_whitespace = left_index
-                            break
-                        left_index -= 1
-                    
-                    next_whitespace = text.find(" ", index + chunk_size)
-                    if next_whitespace == -1:
-                        next_whitespace = len(text)
-                    
-                    chunk = text[prev_whitespace:next_whitespace].strip()
-                    chunks.append(chunk)
-                    index = next_whitespace + 1
-                else:
-                    start = max(0, index - overlap + 1)
-                    end = min(index + chunk_size + overlap, len(text))
-                    chunk = text[start:end].strip()
-                    chunks.append(chunk)
-                    index += chunk_size
-
-            return [chunk for chunk in chunks if chunk]  # Remove empty chunks
-            
         except Exception as e:
             print(f"Error chunking text: {e}")
             return [text]  # Return original text as single chunk if chunking fails
@@ -130,25 +185,18 @@ class PDFService:
             List of sections
         """
         try:
-            # A regular expression pattern for titles that
-            # match lines starting with one or more digits, an optional uppercase letter,
-            # followed by a dot, a space, and then up to 50 characters
-            title_pattern = re.compile(r"(\n\d+[A-Z]?\. {1,3}.{0,60}\n)", re.DOTALL)
-            titles = title_pattern.findall(text)
-            
-            # Split the text at these titles
-            sections = re.split(title_pattern, text)
+            # One split pass returns bodies and captured titles interleaved,
+            # so no separate findall scan of the document is needed
+            sections = _TITLE_RE.split(text)
             sections_with_titles = []
-            
+
             # Append the first section
             if sections:
                 sections_with_titles.append(sections[0])
-            
-            # Iterate over the rest of sections
-            for i in range(1, len(titles) + 1):
-                if i * 2 - 1 < len(sections) and i * 2 < len(sections):
-                    section_text = sections[i * 2 - 1].strip() + "\n" + sections[i * 2].strip()
-                    sections_with_titles.append(section_text)
+
+            # Pair each title with the body that follows it
+            for title, body in zip(sections[1::2], sections[2::2]):
+                sections_with_titles.append(title.strip() + "\n" + body.strip())
 
             return [section for section in sections_with_titles if section.strip()]
             
@@ -223,7 +271,19 @@ class PDFService:
         """
         try:
             metadata = {}
-            
+
+            if fitz is not None:
+                with fitz.open(pdf_path) as doc:
+                    metadata.update({
+                        "num_pages": doc.page_count,
+                        "pdf_metadata": doc.metadata or {},
+                    })
+                    if doc.page_count:
+                        rect = doc[0].rect
+                        metadata["page_width"] = rect.width
+                        metadata["page_height"] = rect.height
+                return metadata
+
             with pdfplumber.open(pdf_path) as pdf:
                 metadata.update({
                     "num_pages": len(pdf.pages),
@@ -258,22 +318,32 @@ class PDFService:
                 "metadata": self.get_pdf_metadata(pdf_path)
             }
             
+            page_texts = []
+            page_numbers = []
             with pdfplumber.open(pdf_path) as pdf:
                 for i, page in enumerate(pdf.pages):
                     page_text = page.extract_text()
                     if page_text:
-                        result["pages"].append({
-                            "page_number": i + 1,
-                            "text": page_text,
-                            "char_count": len(page_text),
-                            "token_count": self.num_tokens_from_string(page_text)
-                        })
-                        result["full_text"] += page_text + "\n"
-            
-            result["full_text"] = result["full_text"].strip()
+                        page_texts.append(page_text)
+                        page_numbers.append(i + 1)
+
+            result["full_text"] = "\n".join(page_texts).strip()
+
+            # One encode_batch call tokenizes every page plus the full text;
+            # tiktoken parallelizes the batch internally instead of paying
+            # per-call dispatch N+1 times
+            encoded = self.encoding.encode_batch(page_texts + [result["full_text"]])
+            for page_number, page_text, tokens in zip(page_numbers, page_texts, encoded):
+                result["pages"].append({
+                    "page_number": page_number,
+                    "text": page_text,
+                    "char_count": len(page_text),
+                    "token_count": len(tokens)
+                })
+
             result["total_chars"] = len(result["full_text"])
-            result["total_tokens"] = self.num_tokens_from_string(result["full_text"])
-            
+            result["total_tokens"] = len(encoded[-1])
+
             return result
             
         except Exception as e:
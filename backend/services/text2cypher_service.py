@@ -1,8 +1,160 @@
-from typing import Dict, List, Any
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from string import Formatter
+from typing import Dict, List, Any, Tuple
 from .neo4j_service import Neo4jService
 from .gemini_service import GeminiService
 
+# Filters for _clean_cypher_response, compiled once: code fences to strip,
+# prose that should be dropped from LLM replies, and tokens that mark a
+# line as Cypher
+_FENCE_RE = re.compile(r"```(?:cypher)?")
+_SKIP_RE = re.compile(r"explanation|this query|the query|cypher:|query:", re.I)
+_KEEP_RE = re.compile(r"\b(?:MATCH|RETURN|WHERE|ORDER|LIMIT|WITH|UNWIND|CALL)\b", re.I)
+
+
+# Capitalized aggregate-function spellings the LLM sometimes emits; one
+# compiled alternation lowercases them all in a single pass
+_FN_FIX_RE = re.compile(r"\b(Count|Sum|Max|Min|Avg)\(")
+
+# Last-resort query when nothing else can be generated
+_GENERIC_FALLBACK_QUERY = """
+            MATCH (n)
+            RETURN n
+            LIMIT 10
+            """
+
+# Pattern table for _generate_simple_cypher: each lowered question is tested
+# against compiled rules in order and the first hit wins, replacing the old
+# if/elif ladder's repeated substring scans. Anchored lookaheads express
+# "contains all of" conditions in a single pass. The flag marks the
+# multi-condition rules anchored to a specific entity; only those are
+# trusted as a fast path ahead of the LLM, since single-keyword rules
+# (bare 'matrix', a year, a genre name) match far broader questions than
+# their canned queries answer and serve fallback duty only.
+_SIMPLE_PATTERN_RULES = (
+    (
+        re.compile(r"\A(?=.*tom hanks)(?=.*(?:movie|act))", re.S),
+        True,
+        lambda match: ("""
+            MATCH (a:Person)-[:ACTED_IN]->(m:Movie)
+            WHERE toLower(a.name) CONTAINS 'tom hanks'
+            RETURN m.title AS title, m.released AS year
+            ORDER BY m.released DESC
+            """, {}),
+    ),
+    (
+        re.compile(r"\A(?=.*matrix)(?=.*direct)", re.S),
+        True,
+        lambda match: ("""
+                MATCH (d:Person)-[:DIRECTED]->(m:Movie)
+                WHERE toLower(m.title) CONTAINS 'matrix'
+                RETURN d.name AS director, m.title AS movie
+                """, {}),
+    ),
+    (
+        re.compile(r"matrix"),
+        False,
+        lambda match: ("""
+                MATCH (m:Movie)
+                WHERE toLower(m.title) CONTAINS 'matrix'
+                RETURN m.title AS title, m.released AS year
+                ORDER BY m.released
+                """, {}),
+    ),
+    (
+        re.compile(r"1999"),
+        False,
+        lambda match: ("""
+            MATCH (m:Movie)
+            WHERE m.released = 1999
+            RETURN m.title AS title, m.released AS year
+            ORDER BY m.title
+            """, {}),
+    ),
+    (
+        re.compile(r"\A(?=.*apollo 13)(?=.*(?:actor|cast))", re.S),
+        True,
+        lambda match: ("""
+            MATCH (a:Person)-[:ACTED_IN]->(m:Movie)
+            WHERE toLower(m.title) CONTAINS 'apollo 13'
+            RETURN a.name AS actor, m.title AS movie
+            ORDER BY a.name
+            """, {}),
+    ),
+    (
+        re.compile(r"\A(?=.*action)(?=.*before)(?=.*1995)", re.S),
+        True,
+        lambda match: ("""
+            MATCH (m:Movie)-[:IN_GENRE]->(g:Genre)
+            WHERE g.name = 'Action' AND m.released < 1995
+            RETURN m.title AS title, m.released AS year
+            ORDER BY m.released DESC
+            """, {}),
+    ),
+    (
+        re.compile(r"(?P<genre>action|comedy|drama|thriller|horror)"),
+        False,
+        lambda match: ("""
+            MATCH (m:Movie)-[:IN_GENRE]->(g:Genre)
+            WHERE toLower(g.name) = $genre
+            RETURN m.title AS title, m.released AS year
+            ORDER BY m.released DESC
+            LIMIT 10
+            """, {"genre": match.group("genre")}),
+    ),
+    (
+        re.compile(r"acted|actor"),
+        False,
+        lambda match: ("""
+            MATCH (a:Person)-[:ACTED_IN]->(m:Movie)
+            RETURN a.name AS actor, m.title AS movie
+            ORDER BY a.name
+            LIMIT 10
+            """, {}),
+    ),
+    (
+        re.compile(r"directed|director"),
+        False,
+        lambda match: ("""
+            MATCH (d:Person)-[:DIRECTED]->(m:Movie)
+            RETURN d.name AS director, m.title AS movie
+            ORDER BY d.name
+            LIMIT 10
+            """, {}),
+    ),
+    (
+        re.compile(r"movie"),
+        False,
+        lambda match: ("""
+            MATCH (m:Movie)
+            RETURN m.title AS title, m.released AS year
+            ORDER BY m.released DESC
+            LIMIT 10
+            """, {}),
+    ),
+)
+
 class Text2CypherService:
+    # Few-shot examples for the movies dataset, built once at class
+    # definition; immutable so the shared instance is safe to hand out
+    _DEFAULT_EXAMPLES = (
+        (
+            "Who are the two people who have acted in the most movies together?",
+            "MATCH (p1:Person)-[:ACTED_IN]->(m:Movie)<-[:ACTED_IN]-(p2:Person) WHERE p1 <> p2 RETURN p1.name, p2.name, COUNT(m) AS movieCount ORDER BY movieCount DESC LIMIT 1"
+        ),
+        (
+            "In what country was the movie Ready Player One produced?",
+            "MATCH (m:Movie { title: 'Ready Player One' })-[:PRODUCED_IN]->(c:Country) RETURN c.name"
+        ),
+    )
+    _DEFAULT_EXAMPLES_STRING = "\n".join(
+        f"Question: {q}\nCypher: {c}" for q, c in _DEFAULT_EXAMPLES
+    )
+
     def __init__(self, neo4j_service: Neo4jService, gemini_service: GeminiService):
         """
         Initialize Text2Cypher service
@@ -13,30 +165,67 @@ class Text2CypherService:
         """
         self.neo4j_service = neo4j_service
         self.gemini_service = gemini_service
+
+        # Schema introspection fires three full-graph queries, but the schema
+        # only changes on ingestion; cache it under a TTL so repeated Cypher
+        # generations skip the round-trips entirely
+        self._schema_cache = None
+        self._schema_cache_ts = 0.0
+        self._schema_ttl = 300
+        self._schema_lock = threading.Lock()
+        # Formatted prompt string for the cached schema dict; rebuilt only
+        # when the structured schema itself is refreshed
+        self._schema_string_cache = None
+        self._schema_string_for = None
+        # Bumped whenever the cached schema changes; keys the Cypher cache
+        # so entries die with the schema they were generated against
+        self._schema_version = 0
+
+        # Generated Cypher keyed on the normalized question (plus schema
+        # version, terminology and examples); a hit skips the LLM entirely
+        self._cypher_cache = OrderedDict()
+        self._cypher_cache_size = 256
+        self._cypher_cache_lock = threading.Lock()
         
-        # Built-in Neo4j queries for schema inference (fallback when APOC meta.data is not available)
+        # Schema inference via the server's own schema metadata: the
+        # db.schema.* procedures and apoc.meta.data read sampled/streamed
+        # schema state, so cost scales with schema size, not node count
         self.NODE_PROPERTIES_QUERY = """
-        MATCH (n)
-        UNWIND labels(n) AS label
-        WITH label, collect(DISTINCT keys(n)) AS all_keys
-        UNWIND all_keys AS key_list
-        UNWIND key_list AS property
-        WITH label, collect(DISTINCT property) AS properties
-        RETURN {labels: label, properties: [prop IN properties | {property: prop, type: "STRING"}]} AS output
+        CALL db.schema.nodeTypeProperties()
+        YIELD nodeLabels, propertyName, propertyTypes
+        RETURN {labels: nodeLabels, property: propertyName, types: propertyTypes} AS output
         """
         
         self.REL_PROPERTIES_QUERY = """
-        MATCH ()-[r]->()
-        WITH DISTINCT type(r) AS relationshipType
-        RETURN {type: relationshipType, properties: []} AS output
+        CALL db.schema.relTypeProperties()
+        YIELD relType, propertyName, propertyTypes
+        RETURN {type: relType, property: propertyName, types: propertyTypes} AS output
         """
         
-        self.REL_QUERY = """
-        MATCH (a)-[r]->(b)
-        RETURN DISTINCT 
-            {start: labels(a)[0], type: type(r), end: labels(b)[0]} AS output
-        LIMIT 100
+        # Sampling stride for apoc.meta.data: inspect every Nth node per
+        # label, so relationship-pattern discovery stays bounded on graphs
+        # of any size
+        self.schema_sample_size = 1000
+
+        self.REL_QUERY = f"""
+        CALL apoc.meta.data({{sample: {self.schema_sample_size}}})
+        YIELD label, property, type, other, elementType
+        WHERE elementType = 'node' AND type = 'RELATIONSHIP'
+        UNWIND other AS otherLabel
+        RETURN DISTINCT {{start: label, type: property, end: otherLabel}} AS output
         """
+
+        # All three introspection queries in one statement: each runs in a
+        # CALL subquery tagged with a kind discriminator, so a cold schema
+        # fetch costs one round-trip instead of three
+        self.SCHEMA_QUERY = "\nUNION ALL\n".join(
+            f"CALL {{ {query} }} RETURN '{kind}' AS kind, output"
+            for kind, query in (
+                ("node", self.NODE_PROPERTIES_QUERY),
+                ("rel_props", self.REL_PROPERTIES_QUERY),
+                ("rel", self.REL_QUERY),
+            )
+        )
         
         # Default prompt template (exact from documentation)
         self.prompt_template = """
@@ -64,39 +253,132 @@ ONLY RESPOND WITH CYPHER—NO CODE BLOCKS.
 
 User question: {question}
 """
+
+        # Static prompt pieces that never change at runtime, built once
+        self._default_terminology = (
+            "Persons: When a user asks about a person by trade like actor, writer, "
+            "director, producer, or reviewer, they are referring to a node with the "
+            "label Person.\n"
+            "Movies: When a user asks about a film or movie, they are referring to "
+            "a node with the label Movie."
+        )
+        self._default_examples_string = self._DEFAULT_EXAMPLES_STRING
+
+        # str.format re-parses the template for placeholders on every call;
+        # split it into literal/field segments once instead
+        self._template_parts = [
+            (literal, field)
+            for literal, field, _, _ in Formatter().parse(self.prompt_template)
+        ]
     
+    def _render_prompt(self, **values: str) -> str:
+        """Fill the precompiled prompt template without re-parsing it"""
+        parts = []
+        for literal, field in self._template_parts:
+            parts.append(literal)
+            if field:
+                parts.append(values[field])
+        return "".join(parts)
+
     def get_structured_schema(self) -> Dict[str, Any]:
         """
         Get structured schema using APOC procedures (exact from documentation)
-        
+
+        Served from a TTL cache between ingestions; call
+        invalidate_schema_cache after mutating the graph's shape.
+
         Returns:
             Structured schema dictionary
         """
+        with self._schema_lock:
+            if (self._schema_cache is not None
+                    and time.monotonic() - self._schema_cache_ts < self._schema_ttl):
+                return self._schema_cache
+
+        schema = self._fetch_structured_schema()
+
+        if "error" not in schema:
+            with self._schema_lock:
+                self._schema_cache = schema
+                self._schema_cache_ts = time.monotonic()
+                self._schema_version += 1
+
+        return schema
+
+    def invalidate_schema_cache(self):
+        """Drop the cached schema after writes that change the graph shape"""
+        with self._schema_lock:
+            self._schema_cache = None
+            self._schema_cache_ts = 0.0
+            self._schema_string_cache = None
+            self._schema_string_for = None
+            self._schema_version += 1
+
+    def _get_cached_schema_string(self, structured_schema: Dict[str, Any] = None) -> str:
+        """
+        Formatted schema string, memoized against the cached schema dict
+
+        The string is a pure function of the structured schema, so it is
+        reformatted only when the underlying cache entry changes (tracked by
+        object identity — the cached dict lives until TTL expiry or explicit
+        invalidation).
+        """
+        if structured_schema is None:
+            structured_schema = self.get_structured_schema()
+        if "error" in structured_schema:
+            return structured_schema["error"]
+
+        with self._schema_lock:
+            if self._schema_string_for is structured_schema:
+                return self._schema_string_cache
+
+        schema_string = self.get_schema_string(structured_schema)
+
+        with self._schema_lock:
+            self._schema_string_cache = schema_string
+            self._schema_string_for = structured_schema
+
+        return schema_string
+
+    def _fetch_structured_schema(self) -> Dict[str, Any]:
+        """Run the schema introspection queries against Neo4j"""
         try:
-            # Get node properties
-            node_labels_response = self.neo4j_service.execute_query(self.NODE_PROPERTIES_QUERY)
-            node_properties = [
-                data["output"]
-                for data in node_labels_response
-            ]
-            
-            # Get relationship properties
-            rel_properties_query_response = self.neo4j_service.execute_query(self.REL_PROPERTIES_QUERY)
-            rel_properties = [
-                data["output"]
-                for data in rel_properties_query_response
-            ]
-            
-            # Get relationships
-            rel_query_response = self.neo4j_service.execute_query(self.REL_QUERY)
-            relationships = [
-                data["output"]
-                for data in rel_query_response
-            ]
-            
+            # One round-trip; aggregate the per-property rows back into the
+            # label- and type-keyed maps the prompt formatter expects
+            rows = self.neo4j_service.execute_query(self.SCHEMA_QUERY)
+
+            node_props = {}
+            rel_props = {}
+            relationships = []
+
+            for row in rows:
+                kind, output = row["kind"], row["output"]
+                if kind == "node":
+                    prop = output.get("property")
+                    for label in output.get("labels") or []:
+                        props = node_props.setdefault(label, [])
+                        if prop:
+                            props.append({
+                                "property": prop,
+                                "type": (output.get("types") or ["STRING"])[0],
+                            })
+                elif kind == "rel_props":
+                    rel_type = (output.get("type") or "").strip(":`")
+                    if not rel_type:
+                        continue
+                    props = rel_props.setdefault(rel_type, [])
+                    prop = output.get("property")
+                    if prop:
+                        props.append({
+                            "property": prop,
+                            "type": (output.get("types") or ["STRING"])[0],
+                        })
+                else:
+                    relationships.append(output)
+
             return {
-                "node_props": {el["labels"]: el["properties"] for el in node_properties},
-                "rel_props": {el["type"]: el["properties"] for el in rel_properties},
+                "node_props": node_props,
+                "rel_props": rel_props,
                 "relationships": relationships,
             }
             
@@ -121,36 +403,76 @@ User question: {question}
                 return structured_schema["error"]
             
             def _format_props(props: List[Dict[str, Any]]) -> str:
-                return ", ".join([f"{prop['property']}: {prop['type']}" for prop in props])
-            
-            formatted_node_props = [
-                f"{label} {{{_format_props(props)}}}"
-                for label, props in structured_schema["node_props"].items()
-            ]
-            
-            formatted_rel_props = [
-                f"{rel_type} {{{_format_props(props)}}}"
-                for rel_type, props in structured_schema["rel_props"].items()
-            ]
-            
-            formatted_rels = [
-                f"(:{element['start']})-[:{element['type']}]->(:{element['end']})"
-                for element in structured_schema["relationships"]
-            ]
-            
-            return "\n".join([
-                "Node labels and properties:",
-                "\n".join(formatted_node_props),
-                "Relationship types and properties:",
-                "\n".join(formatted_rel_props),
-                "The relationships:",
-                "\n".join(formatted_rels),
-            ])
+                return ", ".join(f"{prop['property']}: {prop['type']}" for prop in props)
+
+            # Accumulate every line in one list and join once, instead of
+            # building three intermediate lists and nesting joins
+            parts = ["Node labels and properties:"]
+            for label, props in structured_schema["node_props"].items():
+                parts.append(f"{label} {{{_format_props(props)}}}")
+
+            parts.append("Relationship types and properties:")
+            for rel_type, props in structured_schema["rel_props"].items():
+                parts.append(f"{rel_type} {{{_format_props(props)}}}")
+
+            parts.append("The relationships:")
+            for element in structured_schema["relationships"]:
+                parts.append(f"(:{element['start']})-[:{element['type']}]->(:{element['end']})")
+
+            return "\n".join(parts)
             
         except Exception as e:
             return f"Error formatting schema: {str(e)}"
     
-    def generate_cypher(self, question: str, terminology: str = "", examples: List[List[str]] = None) -> str:
+    def _schema_string_for_question(self, question: str,
+                                    structured_schema: Dict[str, Any]) -> str:
+        """
+        Build a schema string scoped to the labels a question mentions
+
+        Most questions touch one or two labels, so shipping the whole schema
+        into the prompt wastes LLM context tokens. Labels named in the
+        question are kept along with their neighbours via the retained
+        relationship patterns; the rest collapse to a one-line summary. Falls
+        back to the full memoized string when no label matches.
+        """
+        question_lower = question.lower()
+        node_props = structured_schema.get("node_props", {})
+
+        matched = {label for label in node_props if label.lower() in question_lower}
+        if not matched:
+            return self._get_cached_schema_string(structured_schema)
+
+        relationships = [
+            rel for rel in structured_schema.get("relationships", [])
+            if rel["start"] in matched or rel["end"] in matched
+        ]
+
+        # Keep the endpoints of retained patterns so the prompt never
+        # references a label it does not describe
+        for rel in relationships:
+            matched.add(rel["start"])
+            matched.add(rel["end"])
+        rel_types = {rel["type"] for rel in relationships}
+
+        reduced = {
+            "node_props": {l: p for l, p in node_props.items() if l in matched},
+            "rel_props": {
+                t: p for t, p in structured_schema.get("rel_props", {}).items()
+                if t in rel_types
+            },
+            "relationships": relationships,
+        }
+
+        schema_string = self.get_schema_string(reduced)
+
+        other = sorted(set(node_props) - matched)
+        if other:
+            schema_string += "\nOther labels present (omitted): " + ", ".join(other)
+
+        return schema_string
+
+    def generate_cypher(self, question: str, terminology: str = "", examples: List[List[str]] = None,
+                        structured_schema: Dict[str, Any] = None) -> Tuple[str, Dict[str, Any]]:
         """
         Generate Cypher query from natural language question (exact from documentation)
         
@@ -158,18 +480,47 @@ User question: {question}
             question: Natural language question
             terminology: Optional terminology mapping
             examples: Optional list of [question, cypher] pairs for few-shot learning
+            structured_schema: Optional pre-fetched schema, so pipelines that
+                already hold one do not re-resolve it
             
         Returns:
-            Generated Cypher query
+            (Cypher query, query parameters) pair; parameterized queries let
+            Neo4j reuse one plan across values instead of replanning per
+            literal
         """
         try:
-            # Get structured schema
-            structured_schema = self.get_structured_schema()
+            norm_question = re.sub(r"\s+", " ", question.lower().strip())
+            examples_signature = (
+                tuple(tuple(example) for example in examples) if examples else None
+            )
+            cache_key = (norm_question, self._schema_version, terminology, examples_signature)
+
+            with self._cypher_cache_lock:
+                cached = self._cypher_cache.get(cache_key)
+                if cached is not None:
+                    self._cypher_cache.move_to_end(cache_key)
+                    return cached
+
+            # Entity-anchored canned patterns answer without schema or LLM
+            # work at all
+            simple_query = self._generate_simple_cypher(question, specific_only=True)
+            if simple_query is not None:
+                return simple_query
+
+            # Get structured schema unless the caller already has one
+            if structured_schema is None:
+                structured_schema = self.get_structured_schema()
             if "error" in structured_schema:
-                return self._generate_simple_cypher(question)
+                return self._simple_or_default(question)
+
+            # Fetching may have bumped the schema version (cold start, TTL
+            # expiry, invalidation); rebuild the key so the store below
+            # lands under the live version rather than a dead one
+            cache_key = (norm_question, self._schema_version, terminology, examples_signature)
             
-            # Get schema string
-            schema_string = self.get_schema_string(structured_schema)
+            # Scope the schema to the labels the question mentions; falls
+            # back to the full memoized string when nothing matches
+            schema_string = self._schema_string_for_question(question, structured_schema)
             
             # Format examples if provided (following documentation format)
             examples_string = ""
@@ -181,10 +532,10 @@ User question: {question}
                 examples_string = "\n".join(examples_list)
             
             # Create the full prompt using the template from documentation
-            full_prompt = self.prompt_template.format(
+            full_prompt = self._render_prompt(
                 question=question,
                 schema=schema_string,
-                terminology=terminology or "Persons: When a user asks about a person by trade like actor, writer, director, producer, or reviewer, they are referring to a node with the label Person.\nMovies: When a user asks about a film or movie, they are referring to a node with the label Movie.",
+                terminology=terminology or self._default_terminology,
                 examples=examples_string
             )
             
@@ -195,14 +546,21 @@ User question: {question}
             if response and response.strip() and not response.startswith("Error:"):
                 # Clean up the response to extract just the Cypher query
                 cypher_query = self._clean_cypher_response(response)
-                return cypher_query
+
+                with self._cypher_cache_lock:
+                    self._cypher_cache[cache_key] = (cypher_query, {})
+                    self._cypher_cache.move_to_end(cache_key)
+                    if len(self._cypher_cache) > self._cypher_cache_size:
+                        self._cypher_cache.popitem(last=False)
+
+                return cypher_query, {}
             else:
-                return self._generate_simple_cypher(question)
+                return self._simple_or_default(question)
                 
         except Exception as e:
             print(f"Error in LLM-based Cypher generation: {str(e)}")
             # Fallback to simple generation
-            return self._generate_simple_cypher(question)
+            return self._simple_or_default(question)
 
     def _clean_cypher_response(self, response: str) -> str:
         """
@@ -215,8 +573,8 @@ User question: {question}
             Cleaned Cypher query
         """
         try:
-            # Remove code blocks if present
-            response = response.replace("```cypher", "").replace("```", "")
+            # Remove code fences in one pass
+            response = _FENCE_RE.sub("", response)
             
             # Split by lines and find the Cypher query
             lines = response.strip().split('\n')
@@ -227,11 +585,11 @@ User question: {question}
                 # Skip empty lines and comments
                 if not line or line.startswith('//') or line.startswith('#'):
                     continue
-                # Skip explanatory text
-                if any(word in line.lower() for word in ['explanation', 'this query', 'the query', 'cypher:', 'query:']):
+                # Skip explanatory text; keep lines that look like Cypher.
+                # One pass per compiled pattern, no lower()/upper() copies
+                if _SKIP_RE.search(line):
                     continue
-                # Add lines that look like Cypher
-                if any(keyword in line.upper() for keyword in ['MATCH', 'RETURN', 'WHERE', 'ORDER', 'LIMIT', 'WITH', 'UNWIND', 'CALL']):
+                if _KEEP_RE.search(line):
                     cypher_lines.append(line)
             
             if cypher_lines:
@@ -243,50 +601,37 @@ User question: {question}
         except Exception:
             return response.strip()
     
-    def get_default_examples(self) -> List[List[str]]:
+    def get_default_examples(self) -> Tuple[Tuple[str, str], ...]:
         """
         Get default few-shot examples for the movies dataset (from documentation)
         
         Returns:
-            List of [question, cypher] pairs
-        """
-        return [
-            [
-                "Who are the two people who have acted in the most movies together?",
-                "MATCH (p1:Person)-[:ACTED_IN]->(m:Movie)<-[:ACTED_IN]-(p2:Person) WHERE p1 <> p2 RETURN p1.name, p2.name, COUNT(m) AS movieCount ORDER BY movieCount DESC LIMIT 1"
-            ],
-            [
-                "In what country was the movie Ready Player One produced?",
-                "MATCH (m:Movie { title: 'Ready Player One' })-[:PRODUCED_IN]->(c:Country) RETURN c.name"
-            ]
-        ]
+            Tuple of (question, cypher) pairs, shared across calls
+        """
+        return self._DEFAULT_EXAMPLES
     
-    def create_prompt_example(self, question: str = "Who directed the most movies?") -> str:
+    def create_prompt_example(self, question: str = "Who directed the most movies?",
+                              structured_schema: Dict[str, Any] = None) -> str:
         """
         Create a complete prompt example following the documentation format
         
         Args:
             question: Example question to use
+            structured_schema: Optional pre-fetched schema
             
         Returns:
             Complete formatted prompt
         """
         try:
-            # Get schema
-            schema_string = self.get_schema_string()
-            
-            # Default terminology from documentation
-            terminology_string = """
-Persons: When a user asks about a person by trade like actor, writer, director, producer, or reviewer, they are referring to a node with the label 'Person'.
-Movies: When a user asks about a film or movie, they are referring to a node with the label Movie.
-"""
+            # Get schema (memoized against the cached schema)
+            schema_string = self._get_cached_schema_string(structured_schema)
             
-            # Get default examples
-            examples = self.get_default_examples()
-            examples_string = "\n".join([f"Question: {e[0]}\nCypher: {e[1]}" for e in examples])
+            # Default terminology and examples are precomputed at init
+            terminology_string = self._default_terminology
+            examples_string = self._default_examples_string
             
             # Create the full prompt
-            full_prompt = self.prompt_template.format(
+            full_prompt = self._render_prompt(
                 question=question,
                 schema=schema_string,
                 terminology=terminology_string,
@@ -298,107 +643,28 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
         except Exception as e:
             return f"Error creating prompt example: {str(e)}"
     
-    def _generate_simple_cypher(self, question: str) -> str:
-        """Generate simple Cypher queries based on common patterns"""
+    def _generate_simple_cypher(self, question: str, specific_only: bool = False):
+        """
+        Generate simple Cypher queries based on common patterns
+
+        Returns a (query, parameters) pair, or None when no pattern matches
+        (or, with specific_only, when only a broad catch-all matches), so
+        callers can tell a real pattern hit from the absence of one.
+        """
         question_lower = question.lower()
-        
-        # Tom Hanks movies
-        if 'tom hanks' in question_lower and ('movie' in question_lower or 'act' in question_lower):
-            return """
-            MATCH (a:Person)-[:ACTED_IN]->(m:Movie)
-            WHERE toLower(a.name) CONTAINS 'tom hanks'
-            RETURN m.title AS title, m.released AS year
-            ORDER BY m.released DESC
-            """
-        
-        # Matrix movies
-        elif 'matrix' in question_lower:
-            if 'direct' in question_lower or 'director' in question_lower:
-                return """
-                MATCH (d:Person)-[:DIRECTED]->(m:Movie)
-                WHERE toLower(m.title) CONTAINS 'matrix'
-                RETURN d.name AS director, m.title AS movie
-                """
-            else:
-                return """
-                MATCH (m:Movie)
-                WHERE toLower(m.title) CONTAINS 'matrix'
-                RETURN m.title AS title, m.released AS year
-                ORDER BY m.released
-                """
-        
-        # Movies in specific year
-        elif '1999' in question_lower:
-            return """
-            MATCH (m:Movie)
-            WHERE m.released = 1999
-            RETURN m.title AS title, m.released AS year
-            ORDER BY m.title
-            """
-        
-        # Apollo 13 actors
-        elif 'apollo 13' in question_lower and ('actor' in question_lower or 'cast' in question_lower):
-            return """
-            MATCH (a:Person)-[:ACTED_IN]->(m:Movie)
-            WHERE toLower(m.title) CONTAINS 'apollo 13'
-            RETURN a.name AS actor, m.title AS movie
-            ORDER BY a.name
-            """
-        
-        # Action movies before 1995
-        elif 'action' in question_lower and 'before' in question_lower and '1995' in question_lower:
-            return """
-            MATCH (m:Movie)-[:IN_GENRE]->(g:Genre)
-            WHERE g.name = 'Action' AND m.released < 1995
-            RETURN m.title AS title, m.released AS year
-            ORDER BY m.released DESC
-            """
-        
-        # Movies by genre
-        elif any(genre in question_lower for genre in ['action', 'comedy', 'drama', 'thriller', 'horror']):
-            genre = next(genre for genre in ['action', 'comedy', 'drama', 'thriller', 'horror'] if genre in question_lower)
-            return f"""
-            MATCH (m:Movie)-[:IN_GENRE]->(g:Genre)
-            WHERE toLower(g.name) = '{genre}'
-            RETURN m.title AS title, m.released AS year
-            ORDER BY m.released DESC
-            LIMIT 10
-            """
-        
-        # Movies by actor
-        elif 'acted' in question_lower or 'actor' in question_lower:
-            return """
-            MATCH (a:Person)-[:ACTED_IN]->(m:Movie)
-            RETURN a.name AS actor, m.title AS movie
-            ORDER BY a.name
-            LIMIT 10
-            """
-        
-        # Movies by director
-        elif 'directed' in question_lower or 'director' in question_lower:
-            return """
-            MATCH (d:Person)-[:DIRECTED]->(m:Movie)
-            RETURN d.name AS director, m.title AS movie
-            ORDER BY d.name
-            LIMIT 10
-            """
-        
-        # General movie search
-        elif 'movie' in question_lower:
-            return """
-            MATCH (m:Movie)
-            RETURN m.title AS title, m.released AS year
-            ORDER BY m.released DESC
-            LIMIT 10
-            """
-        
-        # Default fallback
-        else:
-            return """
-            MATCH (n)
-            RETURN n
-            LIMIT 10
-            """
+
+        for pattern, specific, build_query in _SIMPLE_PATTERN_RULES:
+            if specific_only and not specific:
+                continue
+            match = pattern.search(question_lower)
+            if match:
+                return build_query(match)
+
+        return None
+
+    def _simple_or_default(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        """Pattern-matched query if any rule hits, else the generic fallback"""
+        return self._generate_simple_cypher(question) or (_GENERIC_FALLBACK_QUERY, {})
     
     def load_movies_dataset(self) -> Dict[str, Any]:
         """
@@ -408,59 +674,63 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             Result of the dataset loading operation
         """
         try:
-            # Create a sample movies dataset
-            movies_queries = [
-                # Create sample movies
-                """
-                CREATE (m1:Movie {title: 'The Matrix', released: 1999, tagline: 'Welcome to the Real World'})
-                CREATE (m2:Movie {title: 'The Matrix Reloaded', released: 2003, tagline: 'Free your mind'})
-                CREATE (m3:Movie {title: 'Apollo 13', released: 1995, tagline: 'Houston, we have a problem'})
-                """,
-                # Create sample people
-                """
-                CREATE (p1:Person {name: 'Keanu Reeves', born: 1964})
-                CREATE (p2:Person {name: 'Carrie-Anne Moss', born: 1967})
-                CREATE (p3:Person {name: 'Laurence Fishburne', born: 1961})
-                CREATE (p4:Person {name: 'Tom Hanks', born: 1956})
-                CREATE (p5:Person {name: 'Kevin Bacon', born: 1958})
-                CREATE (p6:Person {name: 'Lana Wachowski', born: 1965})
-                CREATE (p7:Person {name: 'Ron Howard', born: 1954})
-                """,
-                # Create relationships
-                """
-                MATCH (p1:Person {name: 'Keanu Reeves'}), (m1:Movie {title: 'The Matrix'})
-                CREATE (p1)-[:ACTED_IN {roles: ['Neo']}]->(m1)
-                """,
-                """
-                MATCH (p2:Person {name: 'Carrie-Anne Moss'}), (m1:Movie {title: 'The Matrix'})
-                CREATE (p2)-[:ACTED_IN {roles: ['Trinity']}]->(m1)
-                """,
-                """
-                MATCH (p3:Person {name: 'Laurence Fishburne'}), (m1:Movie {title: 'The Matrix'})
-                CREATE (p3)-[:ACTED_IN {roles: ['Morpheus']}]->(m1)
-                """,
-                """
-                MATCH (p4:Person {name: 'Tom Hanks'}), (m3:Movie {title: 'Apollo 13'})
-                CREATE (p4)-[:ACTED_IN {roles: ['Jim Lovell']}]->(m3)
-                """,
+            # One parameterized UNWIND write per shape instead of nine
+            # single-row statements, each formerly its own transaction and
+            # round-trip; Neo4j also reuses one query plan per statement
+            movies = [
+                {"title": "The Matrix", "released": 1999, "tagline": "Welcome to the Real World"},
+                {"title": "The Matrix Reloaded", "released": 2003, "tagline": "Free your mind"},
+                {"title": "Apollo 13", "released": 1995, "tagline": "Houston, we have a problem"},
+            ]
+            people = [
+                {"name": "Keanu Reeves", "born": 1964},
+                {"name": "Carrie-Anne Moss", "born": 1967},
+                {"name": "Laurence Fishburne", "born": 1961},
+                {"name": "Tom Hanks", "born": 1956},
+                {"name": "Kevin Bacon", "born": 1958},
+                {"name": "Lana Wachowski", "born": 1965},
+                {"name": "Ron Howard", "born": 1954},
+            ]
+            acted_in = [
+                {"person": "Keanu Reeves", "movie": "The Matrix", "roles": ["Neo"]},
+                {"person": "Carrie-Anne Moss", "movie": "The Matrix", "roles": ["Trinity"]},
+                {"person": "Laurence Fishburne", "movie": "The Matrix", "roles": ["Morpheus"]},
+                {"person": "Tom Hanks", "movie": "Apollo 13", "roles": ["Jim Lovell"]},
+                {"person": "Kevin Bacon", "movie": "Apollo 13", "roles": ["Jack Swigert"]},
+            ]
+            directed = [
+                {"person": "Lana Wachowski", "movie": "The Matrix"},
+                {"person": "Ron Howard", "movie": "Apollo 13"},
+            ]
+
+            self.neo4j_service.execute_query(
+                "UNWIND $movies AS movie CREATE (m:Movie) SET m = movie",
+                {"movies": movies},
+            )
+            self.neo4j_service.execute_query(
+                "UNWIND $people AS person CREATE (p:Person) SET p = person",
+                {"people": people},
+            )
+            self.neo4j_service.execute_query(
                 """
-                MATCH (p5:Person {name: 'Kevin Bacon'}), (m3:Movie {title: 'Apollo 13'})
-                CREATE (p5)-[:ACTED_IN {roles: ['Jack Swigert']}]->(m3)
+                UNWIND $acted_in AS row
+                MATCH (p:Person {name: row.person}), (m:Movie {title: row.movie})
+                CREATE (p)-[:ACTED_IN {roles: row.roles}]->(m)
                 """,
+                {"acted_in": acted_in},
+            )
+            self.neo4j_service.execute_query(
                 """
-                MATCH (p6:Person {name: 'Lana Wachowski'}), (m1:Movie {title: 'The Matrix'})
-                CREATE (p6)-[:DIRECTED]->(m1)
+                UNWIND $directed AS row
+                MATCH (p:Person {name: row.person}), (m:Movie {title: row.movie})
+                CREATE (p)-[:DIRECTED]->(m)
                 """,
-                """
-                MATCH (p7:Person {name: 'Ron Howard'}), (m3:Movie {title: 'Apollo 13'})
-                CREATE (p7)-[:DIRECTED]->(m3)
-                """
-            ]
-            
-            # Execute all queries
-            for query in movies_queries:
-                self.neo4j_service.execute_query(query)
-            
+                {"directed": directed},
+            )
+
+            # New labels and relationship types exist now
+            self.invalidate_schema_cache()
+
             return {
                 "message": "Sample movies dataset loaded successfully",
                 "dataset_type": "Sample Movies Dataset",
@@ -484,12 +754,18 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             Dictionary with query, validation results, and execution results
         """
         try:
-            # Generate Cypher query
-            cypher_query = self.generate_cypher(question, terminology, examples)
+            # Resolve the schema once for the whole pipeline and hand it down
+            structured_schema = self.get_structured_schema()
+            if "error" in structured_schema:
+                structured_schema = None
+
+            cypher_query, parameters = self.generate_cypher(question, terminology, examples,
+                                                            structured_schema=structured_schema)
             
             result = {
                 "question": question,
                 "cypher_query": cypher_query,
+                "parameters": parameters,
                 "is_valid": False,
                 "execution_results": [],
                 "error": None
@@ -497,7 +773,7 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             
             # Try to execute the query to validate it
             try:
-                execution_results = self.neo4j_service.execute_query(cypher_query)
+                execution_results = self.neo4j_service.execute_query(cypher_query, parameters)
                 result["is_valid"] = True
                 result["execution_results"] = execution_results
                 
@@ -508,7 +784,7 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
                 fixed_query = self._attempt_query_fix(cypher_query, str(exec_error))
                 if fixed_query != cypher_query:
                     try:
-                        execution_results = self.neo4j_service.execute_query(fixed_query)
+                        execution_results = self.neo4j_service.execute_query(fixed_query, parameters)
                         result["cypher_query"] = fixed_query
                         result["is_valid"] = True
                         result["execution_results"] = execution_results
@@ -543,17 +819,9 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             
             # Fix case sensitivity issues
             if "Unknown function" in error_message or "Invalid input" in error_message:
-                # Try common function name fixes
-                fixes = {
-                    "Count(": "count(",
-                    "Sum(": "sum(",
-                    "Max(": "max(",
-                    "Min(": "min(",
-                    "Avg(": "avg(",
-                }
-                
-                for wrong, correct in fixes.items():
-                    fixed_query = fixed_query.replace(wrong, correct)
+                fixed_query = _FN_FIX_RE.sub(
+                    lambda match: match.group(1).lower() + "(", fixed_query
+                )
             
             # Fix property access issues
             if "Property" in error_message and "does not exist" in error_message:
@@ -576,7 +844,18 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             Natural language explanation
         """
         try:
-            explanation_prompt = f"""
+            messages = self._explanation_messages(cypher_query)
+            explanation = self.gemini_service.chat(messages)
+            
+            return explanation.strip()
+            
+        except Exception as e:
+            return f"Error generating explanation: {str(e)}"
+
+    @staticmethod
+    def _explanation_messages(cypher_query: str) -> List[Dict[str, str]]:
+        """Build the query-explanation prompt"""
+        explanation_prompt = f"""
             Explain the following Cypher query in simple, natural language. 
             Describe what data it retrieves and how it works:
             
@@ -585,14 +864,7 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             
             Explanation:
             """
-            
-            messages = [{"role": "user", "content": explanation_prompt}]
-            explanation = self.gemini_service.chat(messages)
-            
-            return explanation.strip()
-            
-        except Exception as e:
-            return f"Error generating explanation: {str(e)}"
+        return [{"role": "user", "content": explanation_prompt}]
     
     def suggest_improvements(self, cypher_query: str) -> List[str]:
         """
@@ -605,23 +877,40 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             List of improvement suggestions
         """
         try:
-            suggestions = []
-            
-            # Basic performance suggestions
-            if "MATCH" in cypher_query and "WHERE" not in cypher_query:
-                suggestions.append("Consider adding WHERE clauses to filter results early")
-            
-            if cypher_query.count("MATCH") > 3:
-                suggestions.append("Consider combining multiple MATCH clauses for better performance")
-            
-            if "ORDER BY" in cypher_query and "LIMIT" not in cypher_query:
-                suggestions.append("Consider adding LIMIT when using ORDER BY to improve performance")
-            
-            if "*" in cypher_query and "RETURN" in cypher_query:
-                suggestions.append("Consider returning specific properties instead of entire nodes")
-            
+            suggestions = self._static_suggestions(cypher_query)
+
             # Use LLM for more sophisticated suggestions
-            improvement_prompt = f"""
+            messages = self._improvement_messages(cypher_query)
+            llm_suggestions = self.gemini_service.chat(messages)
+
+            return self._merge_suggestions(suggestions, llm_suggestions)
+            
+        except Exception as e:
+            return [f"Error generating suggestions: {str(e)}"]
+
+    @staticmethod
+    def _static_suggestions(cypher_query: str) -> List[str]:
+        """Heuristic performance suggestions that need no LLM call"""
+        suggestions = []
+
+        if "MATCH" in cypher_query and "WHERE" not in cypher_query:
+            suggestions.append("Consider adding WHERE clauses to filter results early")
+
+        if cypher_query.count("MATCH") > 3:
+            suggestions.append("Consider combining multiple MATCH clauses for better performance")
+
+        if "ORDER BY" in cypher_query and "LIMIT" not in cypher_query:
+            suggestions.append("Consider adding LIMIT when using ORDER BY to improve performance")
+
+        if "*" in cypher_query and "RETURN" in cypher_query:
+            suggestions.append("Consider returning specific properties instead of entire nodes")
+
+        return suggestions
+
+    @staticmethod
+    def _improvement_messages(cypher_query: str) -> List[Dict[str, str]]:
+        """Build the improvement-suggestion prompt"""
+        improvement_prompt = f"""
             Analyze the following Cypher query and suggest specific improvements for 
             performance, readability, or best practices:
             
@@ -629,20 +918,52 @@ Movies: When a user asks about a film or movie, they are referring to a node wit
             
             Provide 2-3 specific, actionable suggestions:
             """
-            
-            messages = [{"role": "user", "content": improvement_prompt}]
-            llm_suggestions = self.gemini_service.chat(messages)
-            
-            # Parse LLM suggestions
-            for line in llm_suggestions.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    suggestions.append(line)
-            
-            return suggestions[:5]  # Limit to 5 suggestions
-            
+        return [{"role": "user", "content": improvement_prompt}]
+
+    @staticmethod
+    def _merge_suggestions(suggestions: List[str], llm_suggestions: str) -> List[str]:
+        """Append parsed LLM suggestion lines, capped at five total"""
+        for line in llm_suggestions.split('\n'):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                suggestions.append(line)
+
+        return suggestions[:5]  # Limit to 5 suggestions
+
+    async def aget_query_explanation(self, cypher_query: str) -> str:
+        """Async variant of get_query_explanation using Gemini's async API"""
+        try:
+            messages = self._explanation_messages(cypher_query)
+            explanation = await self.gemini_service.achat(messages)
+            return explanation.strip()
+
+        except Exception as e:
+            return f"Error generating explanation: {str(e)}"
+
+    async def asuggest_improvements(self, cypher_query: str) -> List[str]:
+        """Async variant of suggest_improvements using Gemini's async API"""
+        try:
+            suggestions = self._static_suggestions(cypher_query)
+            llm_suggestions = await self.gemini_service.achat(
+                self._improvement_messages(cypher_query)
+            )
+            return self._merge_suggestions(suggestions, llm_suggestions)
+
         except Exception as e:
             return [f"Error generating suggestions: {str(e)}"]
+
+    async def analyze_query(self, cypher_query: str) -> Dict[str, Any]:
+        """
+        Explanation and improvement suggestions for a query, fetched together
+
+        The two LLM calls are independent, so they run concurrently and the
+        wall-clock cost is the slower of the two rather than their sum.
+        """
+        explanation, suggestions = await asyncio.gather(
+            self.aget_query_explanation(cypher_query),
+            self.asuggest_improvements(cypher_query),
+        )
+        return {"explanation": explanation, "suggestions": suggestions}
     
     def generate_test_queries(self, schema_info: str = None) -> List[Dict[str, str]]:
         """